@@ -51,48 +51,58 @@ class MemoryExtractor(BaseExtractor):
         """
         return self.extract_from_db()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection tuned for bulk reads."""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-65536")  # 64MB page cache
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
     def extract_from_db(self) -> List[IndexEntry]:
         """Extract personal memory facts from SQLite database."""
         entries = []
-        
+
         if not Path(self.db_path).exists():
             print(f"[MemoryExtractor] Database not found: {self.db_path}")
             return entries
-        
+
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
-            
+
             # Check if personal_memory table exists
             cursor.execute("""
-                SELECT name FROM sqlite_master 
+                SELECT name FROM sqlite_master
                 WHERE type='table' AND name='personal_memory'
             """)
             if not cursor.fetchone():
                 print("[MemoryExtractor] personal_memory table not found")
                 conn.close()
                 return entries
-            
-            # Extract all memory facts
+
+            # Extract all memory facts in batches
             cursor.execute("SELECT content, source FROM personal_memory")
-            
-            for content, source_detail in cursor.fetchall():
-                if content and content.strip():
-                    entries.append(IndexEntry(
-                        text=content,
-                        entry_type="chunk",  # Memory facts are searchable content
-                        source="memory",
-                        file_path=None,
-                        file_name=None,
-                        folder=None,
-                        chunk_index=None,
-                        extra_metadata={"memory_source": source_detail or "unknown"}
-                    ))
-            
+
+            while rows := cursor.fetchmany(1000):
+                for content, source_detail in rows:
+                    if content and content.strip():
+                        entries.append(IndexEntry(
+                            text=content,
+                            entry_type="chunk",  # Memory facts are searchable content
+                            source="memory",
+                            file_path=None,
+                            file_name=None,
+                            folder=None,
+                            chunk_index=None,
+                            extra_metadata={"memory_source": source_detail or "unknown"}
+                        ))
+
             conn.close()
             print(f"[MemoryExtractor] Extracted {len(entries)} memory facts")
-            
+
         except Exception as e:
             print(f"[MemoryExtractor] Error reading database: {e}")
-        
+
         return entries
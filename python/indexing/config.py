@@ -92,6 +92,7 @@ class IndexerConfig:
     
     # --- Watcher ---
     debounce_ms: int = 2000      # Batch rapid changes within this window
+    max_pending: int = 10_000    # Flush early past this many pending changes
     
     # --- iCloud ---
     icloud_root: Path = field(
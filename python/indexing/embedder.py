@@ -177,36 +177,44 @@ class Embedder:
         except ValueError:
             folder = str(path.parent)
         
+        # File-invariant values computed once, not once per chunk
+        path_str = str(path)
+        file_name = path.name
+        content_hash = extracted_file.binary_hash
+
         # 1. FILE entry (always)
-        file_description = f"{path.name} - {self._get_type_description(extracted_file.info.extension)} file"
+        file_description = f"{file_name} - {self._get_type_description(extracted_file.info.extension)} file"
         entries.append(IndexEntry(
             text=file_description,
             entry_type=EntryType.FILE,
             source=source,
-            file_path=str(path),
-            file_name=path.name,
+            file_path=path_str,
+            file_name=file_name,
             folder=folder,
             chunk_index=None,
-            content_hash=extracted_file.binary_hash,
+            content_hash=content_hash,
             extra_metadata={"extension": extracted_file.info.extension},
         ))
-        
+
         # 2. CHUNK entries (if we have content)
         if extracted_file.text:
             chunks = self._chunk_text(extracted_file.text)
+            # Identical for every chunk of the file and only ever read
+            # downstream - share one dict instead of allocating N copies
+            chunk_meta = {"total_chunks": len(chunks)}
             for i, chunk in enumerate(chunks):
                 entries.append(IndexEntry(
                     text=chunk,
                     entry_type=EntryType.CHUNK,
                     source=source,
-                    file_path=str(path),
-                    file_name=path.name,
+                    file_path=path_str,
+                    file_name=file_name,
                     folder=folder,
                     chunk_index=i,
-                    content_hash=extracted_file.binary_hash,
-                    extra_metadata={"total_chunks": len(chunks)},
+                    content_hash=content_hash,
+                    extra_metadata=chunk_meta,
                 ))
-        
+
         return entries
     
     def _chunk_text(self, text: str) -> List[str]:
@@ -87,15 +87,15 @@ class DatabaseError(IndexingError):
 
 def handle_error(
     error: Exception,
-    file_path: Optional[Path] = None,
+    file_path: Optional[Path | str] = None,
     context: str = ""
 ) -> ErrorAction:
     """
     Handle an error according to the defined policies.
-    
+
     Args:
         error: The exception that occurred
-        file_path: Path to the file being processed (if applicable)
+        file_path: Path (or raw path string) of the file being processed
         context: Additional context for logging
     
     Returns:
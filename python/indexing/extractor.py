@@ -7,9 +7,10 @@ to pure Python libraries when CLI tools are unavailable.
 
 import asyncio
 import logging
+import os
 import subprocess
 import shutil
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Optional
 
@@ -30,6 +31,30 @@ if not _PDFTOTEXT_AVAILABLE:
     )
 
 
+def _pypdf_extract(path_str: str) -> Optional[str]:
+    """Pure-Python PDF parse (runs in a worker process - GIL-bound work)."""
+    try:
+        from pypdf import PdfReader
+        reader = PdfReader(path_str)
+        text_parts = []
+        for page in reader.pages:
+            if text := page.extract_text():
+                text_parts.append(text)
+        return "\n".join(text_parts)
+    except Exception:
+        return None
+
+
+def _docx_extract(path_str: str) -> Optional[str]:
+    """Word document parse (runs in a worker process - GIL-bound work)."""
+    try:
+        from docx import Document
+        doc = Document(path_str)
+        return "\n".join(p.text for p in doc.paragraphs if p.text)
+    except Exception:
+        return None
+
+
 class Extractor:
     """
     Fast parallel text extractor.
@@ -41,7 +66,15 @@ class Extractor:
     def __init__(self, config: IndexerConfig | None = None):
         self.config = config or get_config()
         self._executor: ThreadPoolExecutor | None = None
-    
+        self._process_pool: ProcessPoolExecutor | None = None
+        # Extension-keyed dispatch: one dict lookup per file instead of
+        # an if/elif chain re-testing the extension
+        self._dispatch = {
+            ".pdf": self._extract_pdf,
+            ".docx": self._extract_docx,
+            ".doc": self._extract_docx,
+        }
+
     def _get_executor(self) -> ThreadPoolExecutor:
         if self._executor is None:
             self._executor = ThreadPoolExecutor(
@@ -49,6 +82,20 @@ class Extractor:
                 thread_name_prefix="extractor"
             )
         return self._executor
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        """
+        Pool for CPU-bound pure-Python parsers (pypdf, python-docx).
+
+        Those hold the GIL for the whole parse, so running them on the
+        thread pool serializes extraction; separate processes give real
+        core parallelism. Created lazily - most scans never need it.
+        """
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=max(1, (os.cpu_count() or 2) - 1)
+            )
+        return self._process_pool
     
     async def extract_files(self, files: List[HashedFile]) -> List[ExtractedFile]:
         """
@@ -100,12 +147,7 @@ class Extractor:
         
         try:
             # Route to appropriate extractor
-            if ext == ".pdf":
-                text = self._extract_pdf(path)
-            elif ext in {".docx", ".doc"}:
-                text = self._extract_docx(path)
-            else:
-                text = self._extract_text(path)
+            text = self._dispatch.get(ext, self._extract_text)(path)
             
             # Get first line for display
             first_line = ""
@@ -158,26 +200,24 @@ class Extractor:
     def _extract_pdf_pypdf(self, path: Path) -> Optional[str]:
         """Extract PDF text using pypdf (pure Python fallback)."""
         try:
-            from pypdf import PdfReader
-            reader = PdfReader(str(path))
-            text_parts = []
-            for page in reader.pages:
-                if text := page.extract_text():
-                    text_parts.append(text)
-            return "\n".join(text_parts)
+            text = self._get_process_pool().submit(_pypdf_extract, str(path)).result()
         except Exception as e:
             logger.debug(f"pypdf extraction failed for {path.name}: {e}")
             return None
-    
+        if text is None:
+            logger.debug(f"pypdf extraction failed for {path.name}")
+        return text
+
     def _extract_docx(self, path: Path) -> Optional[str]:
         """Extract text from Word document."""
         try:
-            from docx import Document
-            doc = Document(str(path))
-            return "\n".join(p.text for p in doc.paragraphs if p.text)
+            text = self._get_process_pool().submit(_docx_extract, str(path)).result()
         except Exception as e:
             logger.debug(f"DOCX extraction failed for {path.name}: {e}")
             return None
+        if text is None:
+            logger.debug(f"DOCX extraction failed for {path.name}")
+        return text
     
     def _extract_text(self, path: Path) -> Optional[str]:
         """Read plain text file."""
@@ -187,10 +227,13 @@ class Extractor:
             return None
     
     def close(self):
-        """Shutdown the thread pool."""
+        """Shutdown the worker pools."""
         if self._executor:
             self._executor.shutdown(wait=False)
             self._executor = None
+        if self._process_pool:
+            self._process_pool.shutdown(wait=False)
+            self._process_pool = None
 
 
 async def extract_files(
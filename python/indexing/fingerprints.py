@@ -0,0 +1,73 @@
+"""
+Fingerprints - Fast-path skip filter for unchanged files.
+
+Persists a compact set of (path, mtime, size) digests from the previous
+run so a rescan can skip hashing and extraction for files that cannot
+have changed, before any bytes are read.
+"""
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import Set
+
+from .config import get_config, IndexerConfig
+from .models import FileInfo
+
+
+logger = logging.getLogger(__name__)
+
+_DIGEST_SIZE = 16
+
+
+class FingerprintCache:
+    """
+    Persistent set of file fingerprints.
+
+    A fingerprint is a 16-byte blake2b digest of "path:mtime:size".
+    Membership means the file looked exactly like this on a prior run,
+    so the cascade can skip it without reading its content. The set is
+    exact (no false positives), unlike the probabilistic filters it
+    replaces, so a hit is always safe to skip.
+    """
+
+    def __init__(self, config: IndexerConfig | None = None):
+        self.config = config or get_config()
+        self.path = Path(str(self.config.index_path) + ".fingerprints")
+        self._seen: Set[bytes] = self._load()
+
+    @staticmethod
+    def fingerprint(file_info: FileInfo) -> bytes:
+        """Digest of everything stat() tells us about the file."""
+        key = f"{file_info.path}:{file_info.mtime.timestamp()}:{file_info.size}"
+        return hashlib.blake2b(key.encode(), digest_size=_DIGEST_SIZE).digest()
+
+    def __contains__(self, fp: bytes) -> bool:
+        return fp in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def add(self, fp: bytes) -> None:
+        self._seen.add(fp)
+
+    def _load(self) -> Set[bytes]:
+        """Load fingerprints from disk (fixed-width binary records)."""
+        if not self.path.exists():
+            return set()
+        try:
+            data = self.path.read_bytes()
+        except OSError as e:
+            logger.warning(f"Could not read fingerprint cache: {e}")
+            return set()
+        return {
+            data[i:i + _DIGEST_SIZE]
+            for i in range(0, len(data) - len(data) % _DIGEST_SIZE, _DIGEST_SIZE)
+        }
+
+    def save(self) -> None:
+        """Persist the current fingerprint set next to the index."""
+        try:
+            self.path.write_bytes(b"".join(self._seen))
+        except OSError as e:
+            logger.warning(f"Could not write fingerprint cache: {e}")
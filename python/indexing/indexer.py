@@ -7,6 +7,8 @@ the LEANN vector index.
 
 import logging
 import sqlite3
+from collections import defaultdict
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional, Tuple, Set
@@ -37,6 +39,7 @@ class Indexer:
         self._conn: Optional[sqlite3.Connection] = None
         self._embedder = get_embedder(config)
         self._leann_builder = None
+        self._tables: frozenset[str] = frozenset()
     
     def _get_connection(self) -> sqlite3.Connection:
         """Get or create database connection."""
@@ -95,6 +98,11 @@ class Indexer:
             CREATE INDEX IF NOT EXISTS idx_chunks_content ON chunks(content_id);
         """)
         conn.commit()
+
+        # Snapshot the schema once so callers can check table presence
+        # without another sqlite_master scan
+        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        self._tables = frozenset(row[0] for row in cursor.fetchall())
     
     def get_existing_hashes(self) -> Set[str]:
         """Get all content hashes currently in the database."""
@@ -108,6 +116,28 @@ class Indexer:
         cursor = conn.execute("SELECT path FROM paths")
         return {row[0] for row in cursor.fetchall()}
     
+    def get_index_state(self) -> Tuple[frozenset, frozenset]:
+        """
+        Get all indexed paths and content hashes in one round-trip.
+
+        Cheaper than calling get_existing_paths() and
+        get_existing_hashes() back-to-back when both are needed.
+
+        Returns:
+            (paths, hashes) as frozensets
+        """
+        conn = self._get_connection()
+        cursor = conn.execute("""
+            SELECT 'p' AS kind, path AS value FROM paths
+            UNION ALL
+            SELECT 'h', content_hash FROM content
+        """)
+        paths: Set[str] = set()
+        hashes: Set[str] = set()
+        for kind, value in cursor:
+            (paths if kind == "p" else hashes).add(value)
+        return frozenset(paths), frozenset(hashes)
+
     def find_content_by_hash(self, content_hash: str) -> Optional[int]:
         """Find content ID by hash. Returns None if not found."""
         conn = self._get_connection()
@@ -118,6 +148,36 @@ class Indexer:
         row = cursor.fetchone()
         return row[0] if row else None
     
+    # Secondary indexes rebuilt by bulk_mode(). content_hash keeps its
+    # implicit UNIQUE index throughout, so hash lookups stay fast.
+    _SECONDARY_INDEXES = (
+        ("idx_content_hash", "content(content_hash)"),
+        ("idx_paths_content", "paths(content_id)"),
+        ("idx_paths_source", "paths(source)"),
+        ("idx_chunks_content", "chunks(content_id)"),
+    )
+
+    @contextmanager
+    def bulk_mode(self):
+        """
+        Drop secondary indexes for the duration of a bulk load.
+
+        Per-row B-tree maintenance dominates large inserts; rebuilding
+        the indexes once afterwards (plus ANALYZE for the planner)
+        amortizes that into a single pass.
+        """
+        conn = self._get_connection()
+        for name, _ in self._SECONDARY_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        conn.execute("PRAGMA defer_foreign_keys = ON")
+        try:
+            yield self
+        finally:
+            for name, definition in self._SECONDARY_INDEXES:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+            conn.execute("ANALYZE")
+            conn.commit()
+
     def bulk_insert_entries(
         self, 
         entries: List[IndexEntry],
@@ -137,12 +197,9 @@ class Indexer:
         conn = self._get_connection()
         
         # Group entries by file (content_hash)
-        file_entries: dict[str, List[Tuple[IndexEntry, np.ndarray]]] = {}
+        file_entries: defaultdict[str, List[Tuple[IndexEntry, np.ndarray]]] = defaultdict(list)
         for entry, emb in zip(entries, embeddings):
-            key = entry.content_hash or entry.file_path
-            if key not in file_entries:
-                file_entries[key] = []
-            file_entries[key].append((entry, emb))
+            file_entries[entry.content_hash or entry.file_path].append((entry, emb))
         
         now = int(datetime.now().timestamp())
         
@@ -285,7 +342,31 @@ class Indexer:
         
         conn = self._get_connection()
         builder = LeannBuilder(backend_name="hnsw")
-        
+
+        # Hoist per-row attribute lookups out of the loops; rows are
+        # pulled in fetchmany batches so sqlite amortizes cursor stepping
+        BATCH_SIZE = 1000
+        add_vector = builder.add_vector
+        deserialize = self._embedder.deserialize_embedding
+
+        # dict.copy() clones the hash-table layout directly - cheaper than
+        # rebuilding an N-key dict literal for every row
+        file_meta_proto = {
+            "type": "file",
+            "file_path": None,
+            "file_name": None,
+            "source": None,
+            "text": None,
+        }
+        chunk_meta_proto = {
+            "type": "chunk",
+            "file_path": None,
+            "file_name": None,
+            "source": None,
+            "chunk_index": None,
+            "text": None,
+        }
+
         # Add file entries
         cursor = conn.execute("""
             SELECT c.id, c.embedding, c.first_line, p.path, p.file_name, p.source
@@ -293,23 +374,19 @@ class Indexer:
             JOIN paths p ON p.content_id = c.id
             WHERE c.embedding IS NOT NULL
         """)
-        
+
         file_count = 0
-        for row in cursor:
-            if row["embedding"]:
-                embedding = self._embedder.deserialize_embedding(row["embedding"])
-                builder.add_vector(
-                    embedding,
-                    metadata={
-                        "type": "file",
-                        "file_path": row["path"],
-                        "file_name": row["file_name"],
-                        "source": row["source"],
-                        "text": row["first_line"],
-                    }
-                )
-                file_count += 1
-        
+        while rows := cursor.fetchmany(BATCH_SIZE):
+            for row in rows:
+                if row["embedding"]:
+                    meta = file_meta_proto.copy()
+                    meta["file_path"] = row["path"]
+                    meta["file_name"] = row["file_name"]
+                    meta["source"] = row["source"]
+                    meta["text"] = row["first_line"]
+                    add_vector(deserialize(row["embedding"]), metadata=meta)
+                    file_count += 1
+
         # Add chunks
         chunk_count = 0
         if include_chunks:
@@ -321,21 +398,17 @@ class Indexer:
                 JOIN paths p ON p.content_id = c.id
                 WHERE ch.embedding IS NOT NULL
             """)
-            
-            for row in cursor:
-                embedding = self._embedder.deserialize_embedding(row["embedding"])
-                builder.add_vector(
-                    embedding,
-                    metadata={
-                        "type": "chunk",
-                        "file_path": row["path"],
-                        "file_name": row["file_name"],
-                        "source": row["source"],
-                        "chunk_index": row["chunk_index"],
-                        "text": row["text"],  # Store full text for RAG
-                    }
-                )
-                chunk_count += 1
+
+            while rows := cursor.fetchmany(BATCH_SIZE):
+                for row in rows:
+                    meta = chunk_meta_proto.copy()
+                    meta["file_path"] = row["path"]
+                    meta["file_name"] = row["file_name"]
+                    meta["source"] = row["source"]
+                    meta["chunk_index"] = row["chunk_index"]
+                    meta["text"] = row["text"]  # Store full text for RAG
+                    add_vector(deserialize(row["embedding"]), metadata=meta)
+                    chunk_count += 1
         
         # Build and save
         index_path = str(self.config.index_path)
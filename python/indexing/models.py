@@ -5,7 +5,9 @@ These dataclasses represent the data flowing through the pipeline stages,
 ensuring type safety and clear interfaces between modules.
 """
 
+import os
 from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
 from typing import Optional, List
 from datetime import datetime
@@ -72,6 +74,31 @@ class FileInfo:
             is_icloud_placeholder=is_placeholder,
         )
 
+    @classmethod
+    def from_dir_entry(cls, entry: os.DirEntry, stat: os.stat_result) -> "FileInfo":
+        """
+        Create FileInfo from a scandir entry and its (cached) stat result.
+
+        Avoids re-statting and extra Path construction on the scanner's
+        hot path - scandir already knows the name and stat fields.
+        """
+        name = entry.name
+        is_placeholder = name.startswith(".") and name.endswith(".icloud")
+
+        # Extract real name from placeholder
+        basename = name[1:-7] if is_placeholder else name
+        dot = basename.rfind(".")
+        extension = basename[dot:].lower() if 0 < dot < len(basename) - 1 else ""
+
+        return cls(
+            path=Path(entry.path),
+            name=name,
+            extension=extension,
+            size=stat.st_size,
+            mtime=datetime.fromtimestamp(stat.st_mtime),
+            is_icloud_placeholder=is_placeholder,
+        )
+
 
 @dataclass
 class HashedFile:
@@ -168,6 +195,15 @@ class ScanResult:
     error_count: int
     duration_seconds: float
 
+    @cached_property
+    def path_set(self) -> frozenset[str]:
+        """All scanned paths as strings, built once per result.
+
+        str(Path) isn't free, so repeated membership checks should use
+        this instead of rebuilding the set comprehension.
+        """
+        return frozenset(str(f.path) for f in self.files)
+
 
 @dataclass
 class IndexingStats:
@@ -23,6 +23,7 @@ from .models import (
 )
 from .scanner import Scanner
 from .hasher import Hasher
+from .fingerprints import FingerprintCache
 from .extractor import Extractor
 from .embedder import Embedder, get_embedder
 from .indexer import Indexer, get_indexer
@@ -88,42 +89,67 @@ class Orchestrator:
         logger.info(f"Starting Cascade Filter scan of {len(roots)} directories...")
         
         # ═══════════════════════════════════════════════════════════════════
-        # PHASE 1: SCAN (Find all files)
+        # PHASES 1+2: SCAN + HASH (overlapped)
         # ═══════════════════════════════════════════════════════════════════
+        # Scanning is syscall-bound and hashing is read-bound, so the two
+        # stages pipeline well: a bounded queue lets hashing start while
+        # the walk is still discovering files, instead of waiting for the
+        # full file list.
         phase_start = time.monotonic()
-        logger.info("Phase 1/5: Scanning files...")
-        
-        scan_result = await self._scanner.scan(roots)
-        stats.files_scanned = len(scan_result.files)
-        
-        phase_time = time.monotonic() - phase_start
-        logger.info(f"Phase 1 complete: {stats.files_scanned} files in {phase_time:.1f}s")
-        
-        # ═══════════════════════════════════════════════════════════════════
-        # PHASE 2: HASH (xxHash bytes, filter known)
-        # ═══════════════════════════════════════════════════════════════════
-        phase_start = time.monotonic()
-        logger.info("Phase 2/5: Hashing files (xxHash)...")
-        
-        # Get existing hashes for the cascade filter
+        logger.info("Phase 1-2/5: Scanning and hashing files (overlapped)...")
+
+        # Fast path: files whose (path, mtime, size) fingerprint matched
+        # a prior run cannot have changed - skip them before reading bytes
+        fingerprints = FingerprintCache(self.config)
         existing_hashes = self._indexer.get_existing_hashes()
-        
-        # Hash all files - this sets is_known flag based on existing_hashes
-        hashed_files = await self._hasher.hash_files(
-            scan_result.files, 
-            existing_hashes
-        )
-        
+
+        unchanged_paths: Set[str] = set()
+        hashed_files: List[HashedFile] = []
+
+        queue: asyncio.Queue[Optional[FileInfo]] = asyncio.Queue(maxsize=2000)
+
+        async def _produce():
+            async for file_info in self._scanner.scan_iter(roots):
+                await queue.put(file_info)
+            await queue.put(None)  # Sentinel: scan finished
+
+        producer = asyncio.create_task(_produce())
+
+        HASH_BATCH = 500
+        batch: List[FileInfo] = []
+        scanning = True
+        while scanning:
+            fi = await queue.get()
+            if fi is None:
+                scanning = False
+            else:
+                stats.files_scanned += 1
+                if fingerprints.fingerprint(fi) in fingerprints:
+                    unchanged_paths.add(str(fi.path))
+                    continue
+                batch.append(fi)
+            if batch and (not scanning or len(batch) >= HASH_BATCH):
+                hashed_files.extend(
+                    await self._hasher.hash_files(batch, existing_hashes)
+                )
+                batch = []
+
+        await producer
+
+        if unchanged_paths:
+            stats.files_skipped += len(unchanged_paths)
+            logger.info(f"Fingerprint filter: {len(unchanged_paths)} unchanged files skipped")
+
         # CASCADE FILTER: Split into new vs known
         new_files = [hf for hf in hashed_files if not hf.is_known]
         known_files = [hf for hf in hashed_files if hf.is_known]
-        
+
         stats.files_deduplicated = len(known_files)
-        stats.files_skipped = len(known_files)
-        
+        stats.files_skipped += len(known_files)
+
         phase_time = time.monotonic() - phase_start
         logger.info(
-            f"Phase 2 complete: {len(new_files)} new, "
+            f"Phases 1-2 complete: {stats.files_scanned} scanned, {len(new_files)} new, "
             f"{len(known_files)} known (skipped) in {phase_time:.1f}s"
         )
         
@@ -171,7 +197,10 @@ class Orchestrator:
             phase_start = time.monotonic()
             logger.info("Phase 5/5: Writing to database...")
             
-            db_stats = self._indexer.bulk_insert_entries(all_entries, embeddings)
+            # Bulk mode defers secondary-index maintenance to one
+            # rebuild after the load
+            with self._indexer.bulk_mode():
+                db_stats = self._indexer.bulk_insert_entries(all_entries, embeddings)
             stats.files_indexed = db_stats.files_indexed
             stats.chunks_created = db_stats.chunks_created
             
@@ -202,10 +231,15 @@ class Orchestrator:
                 self._indexer.bulk_insert_entries([entry], np.array([emb]))
         
         # Remove stale paths (files that no longer exist)
-        current_paths = {str(hf.info.path) for hf in hashed_files}
+        current_paths = {str(hf.info.path) for hf in hashed_files} | unchanged_paths
         removed = self._indexer.remove_stale_paths(current_paths)
         if removed:
             logger.info(f"Removed {removed} stale paths")
+
+        # Remember every file we hashed this run for the next rescan's fast path
+        for hf in hashed_files:
+            fingerprints.add(fingerprints.fingerprint(hf.info))
+        fingerprints.save()
         
         # Build LEANN index
         if build_leann:
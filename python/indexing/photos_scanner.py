@@ -9,16 +9,21 @@ This enables semantic photo search without running our own vision models.
 """
 
 import logging
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Generator
+from typing import Dict, List, Optional, Generator
 import json
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class PhotoEntry:
     """Metadata for a single photo from Apple Photos."""
     file_path: str                    # Full path to original file
@@ -31,7 +36,27 @@ class PhotoEntry:
     is_favorite: bool = False
     is_hidden: bool = False
     album_names: List[str] = field(default_factory=list)
-    
+
+    # Derived fields cached by __post_init__ for query-time scoring
+    _kw_lower: frozenset = field(init=False, repr=False, compare=False)
+    _persons_lower: frozenset = field(init=False, repr=False, compare=False)
+    _albums_lower: frozenset = field(init=False, repr=False, compare=False)
+    _location_lower: str = field(init=False, repr=False, compare=False)
+    _date_ts: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Lowercased forms are computed once here so query-time scoring
+        # never has to call .lower() per entry field.
+        self._kw_lower = frozenset(k.lower() for k in self.keywords)
+        self._persons_lower = frozenset(p.lower() for p in self.persons)
+        self._albums_lower = frozenset(a.lower() for a in self.album_names)
+        self._location_lower = self.location.lower()
+        # Float epoch so ranking sorts compare C doubles, not datetimes
+        try:
+            self._date_ts = self.date.timestamp() if self.date else 0.0
+        except (OverflowError, OSError, ValueError):
+            self._date_ts = 0.0
+
     def to_search_text(self) -> str:
         """
         Create a text representation for embedding fallback search.
@@ -66,9 +91,106 @@ class PhotoEntry:
             "date": self.date.isoformat() if self.date else None,
             "apple_uuid": self.apple_uuid,
             "is_favorite": self.is_favorite,
+            "is_hidden": self.is_hidden,
             "album_names": self.album_names,
         }
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "PhotoEntry":
+        """Reconstruct an entry from a to_dict() payload (disk cache)."""
+        return cls(
+            file_path=data["file_path"],
+            file_name=data["file_name"],
+            keywords=data.get("keywords", []),
+            persons=data.get("persons", []),
+            location=data.get("location", ""),
+            date=datetime.fromisoformat(data["date"]) if data.get("date") else None,
+            apple_uuid=data.get("apple_uuid", ""),
+            is_favorite=data.get("is_favorite", False),
+            is_hidden=data.get("is_hidden", False),
+            album_names=data.get("album_names", []),
+        )
+
+
+def _photo_to_entry(photo) -> Optional[PhotoEntry]:
+    """
+    Convert one osxphotos photo object to a PhotoEntry.
+
+    Module-level so ProcessPoolExecutor workers can use the exact same
+    extraction as the serial scan path.
+    """
+    # Read each lazy property exactly once - osxphotos backs several of
+    # these with their own SQLite queries, so a double access
+    # (truthiness check + use) doubles the cost
+    path = photo.path
+
+    # Skip if no valid path (e.g., iCloud placeholder not downloaded)
+    if not path or not Path(path).exists():
+        return None
+
+    keywords = photo.keywords
+    person_info = photo.person_info
+    album_info = photo.album_info
+
+    return PhotoEntry(
+        file_path=path,
+        file_name=photo.filename or photo.original_filename or "Unknown",
+        keywords=list(keywords) if keywords else [],
+        persons=[p.name for p in person_info if p.name] if person_info else [],
+        location=_format_location(photo),
+        date=photo.date,
+        apple_uuid=photo.uuid,
+        is_favorite=photo.favorite,
+        is_hidden=photo.hidden,
+        album_names=[a.title for a in album_info if a.title] if album_info else [],
+    )
+
+
+def _format_location(photo) -> str:
+    """Format photo location as a readable string."""
+    try:
+        place = photo.place
+        if place:
+            # Apple provides structured place info
+            parts = []
+            if place.name:
+                parts.append(place.name)
+            if place.city:
+                parts.append(place.city)
+            if place.country:
+                parts.append(place.country)
+            return ', '.join(parts) if parts else ""
+
+        location = photo.location
+        if location:
+            # Fallback to coordinates
+            lat, lon = location
+            return f"{lat:.2f}, {lon:.2f}"
+    except Exception:
+        pass
+    return ""
+
+
+def _scan_uuid_shard(library_path: Optional[str], uuids: List[str]) -> List[dict]:
+    """
+    Worker for scan_parallel: open an independent PhotosDB handle
+    (SQLite reads are concurrent-safe) and extract one UUID shard.
+    Entries travel back to the parent as plain dicts.
+    """
+    import osxphotos
+
+    photosdb = osxphotos.PhotosDB(library_path) if library_path else osxphotos.PhotosDB()
+
+    results = []
+    for photo in photosdb.photos(uuid=uuids):
+        try:
+            entry = _photo_to_entry(photo)
+            if entry:
+                results.append(entry.to_dict())
+        except Exception as e:
+            logger.debug(f"Error processing photo {photo.uuid}: {e}")
+    return results
+
 
 class PhotosScanner:
     """
@@ -81,7 +203,22 @@ class PhotosScanner:
     def __init__(self):
         self._photosdb = None
         self._available = None
-    
+        # In-memory cache of scanned entries, invalidated when
+        # Photos.sqlite changes on disk.
+        self._entries_cache: Optional[List[PhotoEntry]] = None
+        self._db_mtime: float = 0.0
+        self._disk_cache_path = Path.home() / ".kel" / "photos_cache.json"
+        # On-disk FTS5 index over photo metadata; None until built (or
+        # left None when this SQLite build lacks FTS5)
+        self._fts_path = Path.home() / ".kel" / "photos_fts.db"
+        self._fts_conn: Optional[sqlite3.Connection] = None
+        # Inverted indices: lowercased token -> int32 posting array of
+        # indices into _entries_cache. Rebuilt alongside the entry cache.
+        self._keyword_index: Dict[str, np.ndarray] = {}
+        self._person_index: Dict[str, np.ndarray] = {}
+        self._album_index: Dict[str, np.ndarray] = {}
+        self._location_tokens: Dict[str, np.ndarray] = {}
+
     def is_available(self) -> bool:
         """Check if osxphotos is installed and Photos library is accessible."""
         if self._available is not None:
@@ -93,7 +230,10 @@ class PhotosScanner:
             self._photosdb = osxphotos.PhotosDB()
             self._available = True
             logger.info(f"Apple Photos library found: {self._photosdb.library_path}")
-            logger.info(f"Total photos: {len(self._photosdb.photos())}")
+            # Counting materializes the entire photo list (O(library
+            # size) inside osxphotos) - only pay for it when debugging
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Total photos: {len(self._photosdb.photos())}")
         except ImportError:
             logger.warning(
                 "osxphotos not installed. Apple Photos integration disabled. "
@@ -137,62 +277,242 @@ class PhotosScanner:
         
         for photo in photos:
             try:
-                # Skip if no valid path (e.g., iCloud placeholder not downloaded)
-                if not photo.path or not Path(photo.path).exists():
-                    continue
-                
-                # Extract metadata
-                entry = PhotoEntry(
-                    file_path=photo.path,
-                    file_name=photo.filename or photo.original_filename or "Unknown",
-                    keywords=list(photo.keywords) if photo.keywords else [],
-                    persons=[p.name for p in photo.person_info if p.name] if photo.person_info else [],
-                    location=self._format_location(photo),
-                    date=photo.date,
-                    apple_uuid=photo.uuid,
-                    is_favorite=photo.favorite,
-                    is_hidden=photo.hidden,
-                    album_names=[a.title for a in photo.album_info if a.title] if photo.album_info else [],
-                )
-                
-                yield entry
-                
+                entry = _photo_to_entry(photo)
+                if entry:
+                    yield entry
             except Exception as e:
                 logger.debug(f"Error processing photo {photo.uuid}: {e}")
                 continue
-    
-    def _format_location(self, photo) -> str:
-        """Format photo location as a readable string."""
+
+    def scan_parallel(self, workers: Optional[int] = None) -> List[PhotoEntry]:
+        """
+        Scan Apple Photos using a process pool sharded by UUID.
+
+        Metadata extraction is dominated by Python attribute access plus
+        osxphotos' internal SQLite queries, which parallelizes well:
+        each worker opens its own PhotosDB handle (SQLite reads are
+        concurrent-safe) and processes one UUID shard.
+        """
+        if not self.is_available():
+            return []
+
+        uuids = [p.uuid for p in self._photosdb.photos(intrash=False)]
+        if not uuids:
+            return []
+
+        workers = workers or os.cpu_count() or 4
+        shard_size = -(-len(uuids) // workers)  # ceil division
+        shards = [
+            uuids[i:i + shard_size] for i in range(0, len(uuids), shard_size)
+        ]
+        library_path = str(self._photosdb.library_path)
+
+        entries: List[PhotoEntry] = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for shard_result in pool.map(
+                _scan_uuid_shard, [library_path] * len(shards), shards
+            ):
+                entries.extend(PhotoEntry.from_dict(d) for d in shard_result)
+
+        logger.info(f"Scanned {len(entries)} photos with {len(shards)} workers")
+        return entries
+
+    def _current_db_mtime(self) -> float:
+        """Get the mtime of Photos.sqlite (0.0 if unavailable)."""
+        try:
+            return Path(self._photosdb.db_path).stat().st_mtime
+        except (OSError, AttributeError, TypeError):
+            return 0.0
+
+    def _get_cached_entries(self) -> List[PhotoEntry]:
+        """
+        Get all photo entries, scanning at most once per database version.
+
+        The Photos library rarely changes between queries, so we keep the
+        materialized entry list in memory and only rebuild it when the
+        Photos.sqlite mtime moves. A JSON copy is kept on disk so app
+        restarts don't pay the full osxphotos traversal either.
+        """
+        if not self.is_available():
+            return []
+
+        db_mtime = self._current_db_mtime()
+
+        if self._entries_cache is not None and db_mtime == self._db_mtime:
+            return self._entries_cache
+
+        # Try the disk cache before paying for a full scan
+        entries = self._load_disk_cache(db_mtime)
+        if entries is None:
+            try:
+                entries = self.scan_parallel()
+            except Exception as e:
+                # Pool startup can fail (sandboxed builds, fork limits);
+                # the serial path always works, just slower
+                logger.warning(f"Parallel photo scan failed ({e}); scanning serially")
+                entries = list(self.scan_iter())
+            self._save_disk_cache(entries, db_mtime)
+
+        self._entries_cache = entries
+        self._db_mtime = db_mtime
+        self._build_indices(entries)
+        self._ensure_fts(entries, db_mtime)
+        return entries
+
+    def _ensure_fts(self, entries: List[PhotoEntry], db_mtime: float) -> None:
+        """
+        Keep an FTS5 index over photo metadata next to the JSON cache.
+
+        SQLite's C tokenizer + built-in BM25 ranking handle keyword
+        queries in sub-millisecond time for realistic library sizes.
+        Invalidated the same way as the entry cache: by Photos.sqlite
+        mtime. Left disabled if this SQLite build lacks FTS5.
+        """
         try:
-            if photo.place:
-                # Apple provides structured place info
-                place = photo.place
-                parts = []
-                if place.name:
-                    parts.append(place.name)
-                if place.city:
-                    parts.append(place.city)
-                if place.country:
-                    parts.append(place.country)
-                return ', '.join(parts) if parts else ""
-            elif photo.location:
-                # Fallback to coordinates
-                lat, lon = photo.location
-                return f"{lat:.2f}, {lon:.2f}"
-        except Exception:
+            conn = sqlite3.connect(self._fts_path)
+
+            # Reuse the existing index if it matches the current DB
+            try:
+                row = conn.execute(
+                    "SELECT library_path, db_mtime FROM fts_meta"
+                ).fetchone()
+            except sqlite3.OperationalError:
+                row = None
+
+            lib = str(self._photosdb.library_path)
+            if row and row[0] == lib and row[1] == db_mtime:
+                self._fts_conn = conn
+                return
+
+            conn.executescript("""
+                DROP TABLE IF EXISTS photos_fts;
+                DROP TABLE IF EXISTS fts_meta;
+                CREATE VIRTUAL TABLE photos_fts USING fts5(
+                    keywords, persons, location, albums,
+                    tokenize='unicode61'
+                );
+                CREATE TABLE fts_meta (library_path TEXT, db_mtime REAL);
+            """)
+            conn.executemany(
+                "INSERT INTO photos_fts (rowid, keywords, persons, location, albums) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    (
+                        i,
+                        " ".join(e.keywords),
+                        " ".join(e.persons),
+                        e.location,
+                        " ".join(e.album_names),
+                    )
+                    for i, e in enumerate(entries)
+                ),
+            )
+            conn.execute("INSERT INTO fts_meta VALUES (?, ?)", (lib, db_mtime))
+            conn.commit()
+            self._fts_conn = conn
+        except sqlite3.Error as e:
+            logger.debug(f"FTS5 photo index unavailable: {e}")
+            self._fts_conn = None
+
+    def _fts_search(self, keywords_lower: List[str], limit: int) -> Optional[List[int]]:
+        """
+        Query the FTS5 index. Returns entry indices ranked by BM25,
+        or None when the index is unavailable (caller falls back to
+        the in-memory inverted indices).
+        """
+        if self._fts_conn is None:
+            return None
+
+        # Quote each sanitized term so FTS query syntax can't leak in
+        terms = [
+            "".join(ch for ch in kw if ch.isalnum() or ch in "_ ")
+            for kw in keywords_lower
+        ]
+        query = " OR ".join(f'"{t}"' for t in terms if t.strip())
+        if not query:
+            return None
+
+        try:
+            rows = self._fts_conn.execute(
+                "SELECT rowid FROM photos_fts WHERE photos_fts MATCH ? "
+                "ORDER BY rank LIMIT ?",
+                (query, limit),
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.debug(f"FTS5 query failed: {e}")
+            return None
+
+        return [row[0] for row in rows]
+
+    def _build_indices(self, entries: List[PhotoEntry]) -> None:
+        """
+        Build inverted indices (token -> entry indices) over the cache.
+
+        Turns search_by_keywords from a full O(photos x keywords) scan
+        into a handful of dict lookups plus short posting-list walks.
+        Postings are stored as int32 arrays so scoring is a vectorized
+        add per matched token rather than a Python loop.
+        """
+        keyword_index: Dict[str, List[int]] = {}
+        person_index: Dict[str, List[int]] = {}
+        album_index: Dict[str, List[int]] = {}
+        location_tokens: Dict[str, List[int]] = {}
+
+        for i, entry in enumerate(entries):
+            for kw in entry._kw_lower:
+                keyword_index.setdefault(kw, []).append(i)
+            for person in entry._persons_lower:
+                person_index.setdefault(person, []).append(i)
+            for album in entry._albums_lower:
+                album_index.setdefault(album, []).append(i)
+            if entry._location_lower:
+                for token in entry._location_lower.replace(",", " ").split():
+                    location_tokens.setdefault(token, []).append(i)
+
+        as_arrays = lambda index: {
+            token: np.asarray(posting, dtype=np.int32)
+            for token, posting in index.items()
+        }
+        self._keyword_index = as_arrays(keyword_index)
+        self._person_index = as_arrays(person_index)
+        self._album_index = as_arrays(album_index)
+        self._location_tokens = as_arrays(location_tokens)
+
+    def _load_disk_cache(self, db_mtime: float) -> Optional[List[PhotoEntry]]:
+        """Load cached entries from disk if they match the current DB mtime."""
+        try:
+            with open(self._disk_cache_path) as f:
+                data = json.load(f)
+            if (
+                data.get("db_mtime") == db_mtime
+                and data.get("library_path") == str(self._photosdb.library_path)
+            ):
+                return [PhotoEntry.from_dict(e) for e in data["entries"]]
+        except (OSError, ValueError, KeyError):
             pass
-        return ""
-    
+        return None
+
+    def _save_disk_cache(self, entries: List[PhotoEntry], db_mtime: float) -> None:
+        """Persist scanned entries to disk, keyed by library path + mtime."""
+        try:
+            self._disk_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._disk_cache_path, "w") as f:
+                json.dump({
+                    "library_path": str(self._photosdb.library_path),
+                    "db_mtime": db_mtime,
+                    "entries": [e.to_dict() for e in entries],
+                }, f)
+        except OSError as e:
+            logger.debug(f"Could not write photos cache: {e}")
+
     def get_photo_by_uuid(self, uuid: str) -> Optional[PhotoEntry]:
         """Get a single photo by its Apple UUID."""
         if not self.is_available():
             return None
-        
-        photos = self._photosdb.photos(uuid=[uuid])
-        if photos:
-            for entry in self.scan_iter():
-                if entry.apple_uuid == uuid:
-                    return entry
+
+        for entry in self._get_cached_entries():
+            if entry.apple_uuid == uuid:
+                return entry
         return None
     
     def search_by_keywords(
@@ -221,47 +541,61 @@ class PhotosScanner:
         
         # Normalize keywords for matching
         keywords_lower = [k.lower() for k in keywords]
-        
-        results = []
-        
-        for entry in self.scan_iter():
-            score = 0
-            
-            # Match keywords
-            for kw in entry.keywords:
-                if kw.lower() in keywords_lower:
-                    score += 2  # Strong match
-                elif any(k in kw.lower() for k in keywords_lower):
-                    score += 1  # Partial match
-            
-            # Match persons
+
+        entries = self._get_cached_entries()
+        if not entries:
+            return []
+
+        # Fast path: BM25-ranked FTS5 query covering all fields
+        if include_persons and include_locations:
+            rowids = self._fts_search(keywords_lower, limit)
+            if rowids is not None:
+                return [entries[i] for i in rowids]
+
+        # One score slot per photo; each matched posting is a single
+        # vectorized add instead of per-index dict arithmetic
+        scores = np.zeros(len(entries), dtype=np.int32)
+
+        def bump(posting: Optional[np.ndarray], points: int):
+            if posting is not None:
+                scores[posting] += points
+
+        for kw in keywords_lower:
+            # Exact token matches are O(1) dict lookups
+            bump(self._keyword_index.get(kw), 2)       # Strong match
             if include_persons:
-                for person in entry.persons:
-                    person_lower = person.lower()
-                    if person_lower in keywords_lower:
-                        score += 3  # Very strong match (named person)
-                    elif any(k in person_lower for k in keywords_lower):
-                        score += 2
-            
-            # Match location
-            if include_locations and entry.location:
-                location_lower = entry.location.lower()
-                for kw in keywords_lower:
-                    if kw in location_lower:
-                        score += 1
-            
-            # Match album names
-            for album in entry.album_names:
-                if album.lower() in keywords_lower:
-                    score += 1
-            
-            if score > 0:
-                results.append((score, entry))
-        
+                bump(self._person_index.get(kw), 3)    # Named person
+            bump(self._album_index.get(kw), 1)
+
+            # Partial matches scan the (small) token vocabulary,
+            # not every photo
+            for token, indices in self._keyword_index.items():
+                if kw in token and kw != token:
+                    bump(indices, 1)
+            if include_persons:
+                for token, indices in self._person_index.items():
+                    if kw in token and kw != token:
+                        bump(indices, 2)
+            if include_locations:
+                for token, indices in self._location_tokens.items():
+                    if kw in token:
+                        bump(indices, 1)
+
+        matched = np.nonzero(scores)[0]
+
+        # Keep only the top-limit candidates before materializing
+        # anything: argpartition is O(matches) vs sort's O(n log n),
+        # and memory stays O(limit) even when thousands of photos hit
+        if len(matched) > limit:
+            top = np.argpartition(-scores[matched], limit - 1)[:limit]
+            matched = matched[top]
+
+        results = [(int(scores[i]), entries[i]) for i in matched]
+
         # Sort by score descending, then by date descending
-        results.sort(key=lambda x: (x[0], x[1].date or datetime.min), reverse=True)
-        
-        return [entry for _, entry in results[:limit]]
+        results.sort(key=lambda x: (x[0], x[1]._date_ts), reverse=True)
+
+        return [entry for _, entry in results]
 
 
 # Singleton instance
@@ -1,16 +1,19 @@
 """
 Scanner - Fast parallel file system traversal.
 
-Uses asyncio for non-blocking directory traversal with controlled
-concurrency to avoid overwhelming the file system.
+Walks directory trees iteratively (explicit work queue, no recursion)
+with the blocking scandir/stat syscalls fanned out to a thread pool,
+keeping the event loop free and per-directory overhead constant.
 """
 
 import asyncio
 import logging
 import os
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import AsyncGenerator, Set, List
+from typing import AsyncGenerator, Set, List, Tuple
 
 from .config import get_config, IndexerConfig
 from .models import FileInfo, ScanResult
@@ -28,23 +31,34 @@ class Scanner:
     directories and files that match skip patterns.
     """
     
+    # System files that are never worth indexing
+    _SYSTEM_FILES = frozenset({".DS_Store", "Thumbs.db", "desktop.ini"})
+
     def __init__(self, config: IndexerConfig | None = None):
         self.config = config or get_config()
-        self._semaphore: asyncio.Semaphore | None = None
-        
+        # Frozen copies of the skip patterns so the per-entry checks are
+        # plain hash lookups with no Path construction
+        self._skip_dirs = frozenset(self.config.skip_dirs)
+        self._skip_extensions = frozenset(
+            e.lower() if e.startswith(".") else f".{e.lower()}"
+            for e in self.config.skip_extensions
+        )
+        # str.endswith with a tuple is a single C call - cheaper than
+        # slicing out the suffix and probing a set
+        self._skip_ext_tuple = tuple(self._skip_extensions)
+
     async def scan(self, roots: List[Path] | None = None) -> ScanResult:
         """
         Scan directories and return all found files.
-        
+
         Args:
             roots: Directories to scan (default: config.roots)
-            
+
         Returns:
             ScanResult with list of FileInfo and statistics
         """
         roots = roots or self.config.roots
-        self._semaphore = asyncio.Semaphore(self.config.scanner_concurrency)
-        
+
         start_time = time.monotonic()
         files: List[FileInfo] = []
         skipped = 0
@@ -77,104 +91,99 @@ class Scanner:
         useful for immediate processing without waiting for full scan.
         """
         roots = roots or self.config.roots
-        
-        if self._semaphore is None:
-            self._semaphore = asyncio.Semaphore(self.config.scanner_concurrency)
-        
+
+        pending: deque[str] = deque()
         for root in roots:
             if not root.exists():
                 logger.warning(f"Root directory not found: {root}")
                 continue
-            
-            async for file_info in self._scan_directory(root):
-                yield file_info
-    
-    async def _scan_directory(self, directory: Path) -> AsyncGenerator[FileInfo, None]:
-        """
-        Recursively scan a single directory.
-        
-        Uses a work queue pattern for breadth-first traversal with
-        controlled parallelism.
-        """
-        # Use os.scandir for efficiency (returns DirEntry with cached stat)
-        try:
-            entries = list(os.scandir(directory))
-        except (PermissionError, OSError) as e:
-            handle_error(e, directory, "scan_directory")
+            pending.append(str(root))
+
+        if not pending:
             return
-        
-        # Process entries concurrently with semaphore
-        subdirs: List[Path] = []
-        
-        for entry in entries:
-            try:
-                if entry.is_dir(follow_symlinks=False):
-                    # Check if we should skip this directory
-                    if self._should_skip_dir(entry.name):
-                        continue
-                    subdirs.append(Path(entry.path))
-                    
-                elif entry.is_file(follow_symlinks=False):
-                    # Check if we should skip this file
-                    if self._should_skip_file(entry.name):
-                        continue
-                    
-                    # Get file info
-                    async with self._semaphore:
-                        file_info = await self._get_file_info(entry)
-                        if file_info:
-                            yield file_info
-                            
-            except (PermissionError, OSError) as e:
-                handle_error(e, Path(entry.path), "scan_entry")
-                continue
-        
-        # Recursively scan subdirectories
-        for subdir in subdirs:
-            async for file_info in self._scan_directory(subdir):
-                yield file_info
-    
-    async def _get_file_info(self, entry: os.DirEntry) -> FileInfo | None:
+
+        # Directory listing is pure syscall work (os.scandir + stat), so
+        # real parallelism comes from threads, not the event loop. Each
+        # worker walks one directory; subdirectories go back on the queue.
+        loop = asyncio.get_running_loop()
+        max_workers = self.config.scanner_concurrency
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            in_flight: Set[asyncio.Future] = set()
+
+            while pending or in_flight:
+                while pending and len(in_flight) < max_workers:
+                    in_flight.add(
+                        loop.run_in_executor(pool, self._walk_dir_sync, pending.popleft())
+                    )
+
+                done, in_flight = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    files, subdirs = future.result()
+                    pending.extend(subdirs)
+                    for file_info in files:
+                        yield file_info
+
+    def _walk_dir_sync(self, directory: str) -> Tuple[List[FileInfo], List[str]]:
         """
-        Get FileInfo from a directory entry.
-        
-        This runs stat() which may block briefly on network filesystems.
+        List a single directory (runs in a worker thread).
+
+        Returns the FileInfo for each kept file plus the subdirectories
+        to enqueue for later walking.
         """
+        files: List[FileInfo] = []
+        subdirs: List[str] = []
+
         try:
-            stat = entry.stat(follow_symlinks=False)
-            return FileInfo.from_path(
-                path=Path(entry.path),
-                mtime=stat.st_mtime,
-                size=stat.st_size,
-            )
+            entries = os.scandir(directory)
         except (PermissionError, OSError) as e:
-            handle_error(e, Path(entry.path), "stat")
-            return None
+            handle_error(e, directory, "scan_directory")
+            return files, subdirs
+
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if self._should_skip_dir(entry.name):
+                            continue
+                        subdirs.append(entry.path)
+
+                    elif entry.is_file(follow_symlinks=False):
+                        if self._should_skip_file(entry.name):
+                            continue
+
+                        # DirEntry caches the stat result from scandir on
+                        # most platforms, so this is usually syscall-free
+                        stat = entry.stat(follow_symlinks=False)
+                        files.append(FileInfo.from_dir_entry(entry, stat))
+
+                except (PermissionError, OSError) as e:
+                    handle_error(e, entry.path, "scan_entry")
+                    continue
+
+        return files, subdirs
     
     def _should_skip_dir(self, name: str) -> bool:
         """Check if a directory should be skipped."""
         # Skip hidden directories (except .icloud files)
         if name.startswith(".") and not name.endswith(".icloud"):
             return True
-        
-        return name in self.config.skip_dirs
-    
+
+        return name in self._skip_dirs
+
     def _should_skip_file(self, name: str) -> bool:
         """Check if a file should be skipped."""
         # Skip system files
-        if name in {".DS_Store", "Thumbs.db", "desktop.ini"}:
+        if name in self._SYSTEM_FILES:
             return True
-        
+
         # Skip hidden files (except .icloud placeholders)
         if name.startswith(".") and not name.endswith(".icloud"):
             return True
-        
-        # Check extension
-        ext = Path(name).suffix.lower()
-        if ext in self.config.skip_extensions:
-            return True
-        
-        return False
+
+        # Check extension without constructing a Path
+        return name.lower().endswith(self._skip_ext_tuple)
 
 
 async def scan_directories(
@@ -7,6 +7,7 @@ debouncing to batch rapid changes.
 
 import asyncio
 import logging
+import re
 import time
 from pathlib import Path
 from typing import Callable, Dict, List, Optional, Set
@@ -27,7 +28,7 @@ class ChangeType(Enum):
     MOVED = "moved"
 
 
-@dataclass
+@dataclass(slots=True)
 class FileChange:
     """A pending file change event."""
     path: Path
@@ -51,10 +52,24 @@ class Watcher:
     ):
         self.config = config or get_config()
         self.on_changes = on_changes
-        
+
+        # One compiled matcher per pattern family: C-level regex search
+        # on the raw path string beats a Python loop over path.parts
+        self._system_files = frozenset({".DS_Store", "Thumbs.db", "desktop.ini"})
+        self._skip_dir_re = re.compile(
+            r"(?:^|/)(?:%s)(?:/|$)" % "|".join(map(re.escape, self.config.skip_dirs))
+        ) if self.config.skip_dirs else None
+        self._skip_ext_re = re.compile(
+            r"\.(?:%s)$" % "|".join(
+                re.escape(e.lstrip(".")) for e in self.config.skip_extensions
+            ),
+            re.IGNORECASE,
+        ) if self.config.skip_extensions else None
+
         self._observer = None
         self._pending_changes: Dict[str, FileChange] = {}
-        self._debounce_task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_event = asyncio.Event()
         self._running = False
         self._loop: Optional[asyncio.AbstractEventLoop] = None
     
@@ -79,30 +94,32 @@ class Watcher:
             def __init__(handler_self):
                 handler_self.watcher = self
             
+            # Watchdog hands us raw path strings; keep them that way on
+            # the hot path and only build Path objects at flush time.
             def on_created(handler_self, event: FileSystemEvent):
                 if not event.is_directory:
                     handler_self.watcher._queue_change(
-                        Path(event.src_path), ChangeType.ADDED
+                        event.src_path, ChangeType.ADDED
                     )
-            
+
             def on_modified(handler_self, event: FileSystemEvent):
                 if not event.is_directory:
                     handler_self.watcher._queue_change(
-                        Path(event.src_path), ChangeType.MODIFIED
+                        event.src_path, ChangeType.MODIFIED
                     )
-            
+
             def on_deleted(handler_self, event: FileSystemEvent):
                 if not event.is_directory:
                     handler_self.watcher._queue_change(
-                        Path(event.src_path), ChangeType.DELETED
+                        event.src_path, ChangeType.DELETED
                     )
-            
+
             def on_moved(handler_self, event: FileSystemEvent):
                 if not event.is_directory:
                     handler_self.watcher._queue_change(
-                        Path(event.dest_path), 
+                        event.dest_path,
                         ChangeType.MOVED,
-                        old_path=Path(event.src_path)
+                        old_path=event.src_path
                     )
         
         self._observer = Observer()
@@ -117,72 +134,93 @@ class Watcher:
         
         self._running = True
         self._observer.start()
+        self._flush_task = self._loop.create_task(self._flush_loop())
         logger.info("File watcher started")
-    
+
     def stop(self):
         """Stop watching."""
         self._running = False
-        
+
         if self._observer:
             self._observer.stop()
             self._observer.join(timeout=2)
             self._observer = None
-        
-        if self._debounce_task:
-            self._debounce_task.cancel()
-            self._debounce_task = None
-        
+
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+
         logger.info("File watcher stopped")
-    
+
     def _queue_change(
-        self, 
-        path: Path, 
+        self,
+        path: Path | str,
         change_type: ChangeType,
-        old_path: Optional[Path] = None,
+        old_path: Optional[Path | str] = None,
     ):
         """Queue a change for debounced processing."""
         # Skip files that match skip patterns
         if self._should_skip(path):
             return
-        
+
         change = FileChange(
             path=path,
             change_type=change_type,
             timestamp=time.monotonic(),
             old_path=old_path,
         )
-        
+
         # Use path as key - later events override earlier ones
-        self._pending_changes[str(path)] = change
-        
-        # Schedule flush
-        self._schedule_flush()
-    
-    def _schedule_flush(self):
-        """Schedule a debounced flush of pending changes."""
-        if self._debounce_task and not self._debounce_task.done():
-            # Already scheduled
+        key = path if isinstance(path, str) else str(path)
+        self._pending_changes[key] = change
+
+        # Huge bursts (e.g. a git checkout touching 50k files) would grow
+        # the pending dict unboundedly - flush immediately past the cap
+        if len(self._pending_changes) >= self.config.max_pending:
+            if self._loop:
+                self._loop.call_soon_threadsafe(self._flush_now)
             return
-        
-        if self._loop:
-            self._debounce_task = self._loop.create_task(self._flush_after_delay())
-    
-    async def _flush_after_delay(self):
-        """Wait for debounce period then flush changes."""
-        await asyncio.sleep(self.config.debounce_ms / 1000.0)
-        await self._flush_changes()
-    
+
+        # Wake the flush loop (cheap no-op when already awake)
+        if self._loop and not self._flush_event.is_set():
+            self._loop.call_soon_threadsafe(self._flush_event.set)
+
+    def _flush_now(self):
+        """Flush without waiting for the debounce window (loop thread)."""
+        asyncio.ensure_future(self._flush_changes())
+
+    async def _flush_loop(self):
+        """
+        Single long-lived debounce loop.
+
+        Sleeps until the first change arrives, waits out the debounce
+        window, then flushes - instead of creating a task per event.
+        """
+        while self._running:
+            await self._flush_event.wait()
+            await asyncio.sleep(self.config.debounce_ms / 1000.0)
+            self._flush_event.clear()
+            await self._flush_changes()
+
     async def _flush_changes(self):
         """Process all pending changes."""
         if not self._pending_changes:
             return
-        
+
         # Grab pending changes
         changes = list(self._pending_changes.values())
         self._pending_changes.clear()
-        
+
+        # Normalize raw string paths (from watchdog) to Path objects
+        # once per deduplicated change, not once per event
+        for change in changes:
+            if not isinstance(change.path, Path):
+                change.path = Path(change.path)
+            if change.old_path is not None and not isinstance(change.old_path, Path):
+                change.old_path = Path(change.old_path)
+
         logger.info(f"Processing {len(changes)} file changes")
-        
+
         # Call handler
         if self.on_changes:
             try:
@@ -190,28 +228,25 @@ class Watcher:
             except Exception as e:
                 logger.error(f"Change handler error: {e}")
     
-    def _should_skip(self, path: Path) -> bool:
+    def _should_skip(self, path: Path | str) -> bool:
         """Check if a path should be skipped."""
-        name = path.name
-        
+        path_str = path if isinstance(path, str) else str(path)
+        name = path_str.rpartition("/")[2]
+
         # Skip system files
-        if name in {".DS_Store", "Thumbs.db", "desktop.ini"}:
+        if name in self._system_files:
             return True
-        
+
         # Skip hidden files (except iCloud placeholders)
         if name.startswith(".") and not name.endswith(".icloud"):
             return True
-        
-        # Check if any parent is in skip list
-        for part in path.parts:
-            if part in self.config.skip_dirs:
-                return True
-        
-        # Check extension
-        ext = path.suffix.lower()
-        if ext in self.config.skip_extensions:
+
+        # Skip-dir anywhere in the path, and skipped extensions
+        if self._skip_dir_re and self._skip_dir_re.search(path_str):
             return True
-        
+        if self._skip_ext_re and self._skip_ext_re.search(name):
+            return True
+
         return False
     
     def get_pending_count(self) -> int:
@@ -253,9 +288,16 @@ class AsyncWatcher(Watcher):
         while self._running:
             try:
                 batch = await asyncio.wait_for(
-                    self._change_queue.get(), 
+                    self._change_queue.get(),
                     timeout=1.0
                 )
+                # Merge any batches that piled up while we were waiting,
+                # so downstream handlers run once per wakeup
+                while True:
+                    try:
+                        batch.extend(self._change_queue.get_nowait())
+                    except asyncio.QueueEmpty:
+                        break
                 yield batch
             except asyncio.TimeoutError:
                 continue
@@ -23,9 +23,6 @@ from typing import List, Optional
 # Add current directory to path so we can import 'indexing'
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from indexing.orchestrator import Orchestrator
-from indexing.config import get_config
-
 # Configure logging to match legacy format roughly
 logging.basicConfig(
     level=logging.INFO,
@@ -41,10 +38,15 @@ def main():
     parser.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging")
     
     args = parser.parse_args()
-    
+
     if args.verbose:
         logger.setLevel(logging.DEBUG)
-    
+
+    # Deferred: pulls in the embedder stack (sentence-transformers etc.),
+    # which is expensive to import for --help / argparse-error runs
+    from indexing.orchestrator import Orchestrator
+    from indexing.config import get_config
+
     config = get_config()
     db_path = config.db_path
     index_path = config.index_path
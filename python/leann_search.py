@@ -3,6 +3,7 @@ LEANN Search - Unified search with source and intent filtering.
 """
 
 import os
+import threading
 from typing import Dict, List, Optional
 
 from leann import LeannSearcher
@@ -12,17 +13,31 @@ INDEX_PATH = os.path.expanduser("~/.kel/leann.index")
 
 # Global searcher (lazy loaded)
 _searcher: Optional[LeannSearcher] = None
+_searcher_lock = threading.Lock()
 
 
 def get_searcher() -> Optional[LeannSearcher]:
-    """Get or create LEANN searcher (lazy loaded)."""
+    """
+    Get or create LEANN searcher (lazy loaded).
+
+    Thread-safe: double-checked locking ensures concurrent callers share
+    one searcher instead of each loading the index.
+    """
     global _searcher
-    
+
     if _searcher is None:
         if not os.path.exists(INDEX_PATH):
             return None
-        _searcher = LeannSearcher(INDEX_PATH)
-    
+        with _searcher_lock:
+            if _searcher is None:
+                try:
+                    # mmap-backed loading lets the OS page cache serve the
+                    # index instead of a large upfront read() copy
+                    _searcher = LeannSearcher(INDEX_PATH, mmap=True)
+                except TypeError:
+                    # Older leann versions don't take an mmap flag
+                    _searcher = LeannSearcher(INDEX_PATH)
+
     return _searcher
 
 
@@ -79,23 +94,25 @@ def search(
     try:
         # Perform search
         results = searcher.search(query, top_k=top_k, metadata_filters=filters)
-        
-        return {
-            "results": [
-                {
-                    "text": r.text,
-                    "source": r.metadata.get("source"),
-                    "type": r.metadata.get("type"),
-                    "file_path": r.metadata.get("file_path"),
-                    "file_name": r.metadata.get("file_name"),
-                    "folder": r.metadata.get("folder"),
-                    "chunk_index": r.metadata.get("chunk_index"),
-                    "score": round(r.score, 4)
-                }
-                for r in results
-            ]
-        }
-        
+
+        # Grab each result's metadata dict once instead of dispatching
+        # through r.metadata for every field
+        formatted = []
+        for r in results:
+            m = r.metadata
+            formatted.append({
+                "text": r.text,
+                "source": m.get("source"),
+                "type": m.get("type"),
+                "file_path": m.get("file_path"),
+                "file_name": m.get("file_name"),
+                "folder": m.get("folder"),
+                "chunk_index": m.get("chunk_index"),
+                "score": round(r.score, 4)
+            })
+
+        return {"results": formatted}
+
     except Exception as e:
         return {
             "error": f"Search failed: {str(e)}",
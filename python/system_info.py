@@ -7,10 +7,15 @@ to answer questions like "Why is my Mac slow?" or "How much RAM do I have?"
 Uses psutil for cross-platform system information gathering.
 """
 
+import heapq
+import io
 import logging
+import os
 import time
 from typing import Dict, Any, List, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
+
+import numpy as np
 
 try:
     import psutil
@@ -26,8 +31,31 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+# Static facts that never change within a process - query them once
+# instead of re-issuing syscalls on every snapshot
+if PSUTIL_AVAILABLE:
+    _CORES_PHYSICAL = psutil.cpu_count(logical=False) or 0
+    _CORES_LOGICAL = psutil.cpu_count(logical=True) or 0
+    _BOOT_TIME = psutil.boot_time()
+    # Prime psutil's internal CPU-time bookkeeping so later non-blocking
+    # cpu_percent(interval=None) calls return real deltas
+    psutil.cpu_percent(interval=None, percpu=True)
+else:
+    _CORES_PHYSICAL = 0
+    _CORES_LOGICAL = 0
+    _BOOT_TIME = 0.0
+
+
+class _Serializable:
+    """Flat dataclasses: a shallow __dict__ copy is a faithful dict view,
+    without the recursive deepcopy dataclasses.asdict performs."""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.__dict__.copy()
+
+
 @dataclass
-class CPUInfo:
+class CPUInfo(_Serializable):
     """CPU information."""
     percent: float
     cores_physical: int
@@ -37,7 +65,7 @@ class CPUInfo:
 
 
 @dataclass
-class MemoryInfo:
+class MemoryInfo(_Serializable):
     """RAM information."""
     total_gb: float
     used_gb: float
@@ -49,7 +77,7 @@ class MemoryInfo:
 
 
 @dataclass
-class DiskInfo:
+class DiskInfo(_Serializable):
     """Disk/storage information for a single mount point."""
     mount_point: str
     total_gb: float
@@ -59,7 +87,7 @@ class DiskInfo:
 
 
 @dataclass
-class ProcessInfo:
+class ProcessInfo(_Serializable):
     """Information about a running process."""
     pid: int
     name: str
@@ -68,7 +96,7 @@ class ProcessInfo:
 
 
 @dataclass
-class BatteryInfo:
+class BatteryInfo(_Serializable):
     """Battery information."""
     percent: float
     charging: bool
@@ -105,18 +133,19 @@ def get_cpu_info() -> Optional[CPUInfo]:
         return None
     
     try:
-        # Get CPU percent (blocking for 0.5s to measure)
-        cpu_percent = psutil.cpu_percent(interval=0.5)
-        per_core = psutil.cpu_percent(interval=0.1, percpu=True)
-        
+        # Non-blocking: returns usage since the previous sample instead
+        # of sleeping 0.6s per snapshot to measure an interval
+        per_core = psutil.cpu_percent(interval=None, percpu=True)
+        cpu_percent = round(sum(per_core) / len(per_core), 1) if per_core else 0.0
+
         # Get CPU frequency
         freq = psutil.cpu_freq()
         freq_mhz = freq.current if freq else None
         
         return CPUInfo(
             percent=cpu_percent,
-            cores_physical=psutil.cpu_count(logical=False) or 0,
-            cores_logical=psutil.cpu_count(logical=True) or 0,
+            cores_physical=_CORES_PHYSICAL,
+            cores_logical=_CORES_LOGICAL,
             per_core_percent=per_core,
             frequency_mhz=freq_mhz,
         )
@@ -154,29 +183,42 @@ def get_disk_info() -> List[DiskInfo]:
         return []
     
     disks = []
+    # On POSIX, one os.statvfs call per mount replaces psutil's
+    # cross-platform dispatch and namedtuple wrapping
+    use_statvfs = hasattr(os, "statvfs")
     try:
-        # Get all disk partitions
+        # Get all disk partitions (enumeration stays on psutil)
         partitions = psutil.disk_partitions(all=False)
-        
+
         for part in partitions:
             try:
-                usage = psutil.disk_usage(part.mountpoint)
+                if use_statvfs:
+                    st = os.statvfs(part.mountpoint)
+                    total = st.f_blocks * st.f_frsize
+                    free = st.f_bavail * st.f_frsize
+                    used = total - free
+                    percent = round(100 * used / total, 1) if total else 0.0
+                else:
+                    usage = psutil.disk_usage(part.mountpoint)
+                    total, used, free = usage.total, usage.used, usage.free
+                    percent = usage.percent
+
                 # Skip very small partitions
-                if usage.total < 1024 * 1024 * 100:  # < 100MB
+                if total < 1024 * 1024 * 100:  # < 100MB
                     continue
-                
+
                 disks.append(DiskInfo(
                     mount_point=part.mountpoint,
-                    total_gb=bytes_to_gb(usage.total),
-                    used_gb=bytes_to_gb(usage.used),
-                    free_gb=bytes_to_gb(usage.free),
-                    percent=usage.percent,
+                    total_gb=bytes_to_gb(total),
+                    used_gb=bytes_to_gb(used),
+                    free_gb=bytes_to_gb(free),
+                    percent=percent,
                 ))
             except (PermissionError, OSError):
                 continue
     except Exception as e:
         logger.error(f"Failed to get disk info: {e}")
-    
+
     return disks
 
 
@@ -185,35 +227,50 @@ def get_top_processes(n: int = 5) -> tuple[List[ProcessInfo], List[ProcessInfo]]
     if not PSUTIL_AVAILABLE:
         return [], []
     
-    processes = []
+    # Collect raw rows first; byte->MB conversion is vectorized below and
+    # ProcessInfo is only built for the winning rows
+    raw: List[tuple] = []
     try:
-        # Get all processes with their info
         for proc in psutil.process_iter(['pid', 'name', 'memory_info', 'cpu_percent']):
             try:
                 info = proc.info
-                ram_mb = bytes_to_mb(info['memory_info'].rss) if info['memory_info'] else 0
-                cpu_percent = info['cpu_percent'] or 0
-                
-                # Skip system/kernel processes with no RAM
-                if ram_mb < 1:
-                    continue
-                
-                processes.append(ProcessInfo(
-                    pid=info['pid'],
-                    name=info['name'] or 'Unknown',
-                    ram_mb=ram_mb,
-                    cpu_percent=cpu_percent,
-                ))
+                rss = info['memory_info'].rss if info['memory_info'] else 0
+                raw.append((rss, info['cpu_percent'] or 0, info['pid'], info['name'] or 'Unknown'))
             except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
                 continue
     except Exception as e:
         logger.error(f"Failed to get process info: {e}")
         return [], []
-    
-    # Sort by RAM and CPU
-    by_ram = sorted(processes, key=lambda p: p.ram_mb, reverse=True)[:n]
-    by_cpu = sorted(processes, key=lambda p: p.cpu_percent, reverse=True)[:n]
-    
+
+    if not raw:
+        return [], []
+
+    # One numpy pass converts every rss at once instead of a Python
+    # divide+round per process
+    rss_mb = np.round(
+        np.fromiter((t[0] for t in raw), dtype=np.float64, count=len(raw)) / (1024 ** 2),
+        1,
+    )
+
+    # Skip system/kernel processes with no RAM
+    processes = [
+        (ram_mb, cpu_percent, pid, name)
+        for ram_mb, (_, cpu_percent, pid, name) in zip(rss_mb.tolist(), raw)
+        if ram_mb >= 1
+    ]
+
+    # nlargest keeps a heap of n instead of fully sorting hundreds of rows
+    by_ram = [
+        ProcessInfo(pid=pid, name=name, ram_mb=ram_mb, cpu_percent=cpu_percent)
+        for ram_mb, cpu_percent, pid, name
+        in heapq.nlargest(n, processes, key=lambda t: t[0])
+    ]
+    by_cpu = [
+        ProcessInfo(pid=pid, name=name, ram_mb=ram_mb, cpu_percent=cpu_percent)
+        for ram_mb, cpu_percent, pid, name
+        in heapq.nlargest(n, processes, key=lambda t: t[1])
+    ]
+
     return by_ram, by_cpu
 
 
@@ -248,8 +305,7 @@ def get_uptime_hours() -> float:
         return 0.0
     
     try:
-        boot_time = psutil.boot_time()
-        uptime_seconds = time.time() - boot_time
+        uptime_seconds = time.time() - _BOOT_TIME
         return round(uptime_seconds / 3600, 1)
     except Exception as e:
         logger.error(f"Failed to get uptime: {e}")
@@ -286,28 +342,28 @@ def get_system_info(sections: Optional[List[str]] = None) -> Dict[str, Any]:
     if "cpu" in sections:
         cpu = get_cpu_info()
         if cpu:
-            result["cpu"] = asdict(cpu)
-    
+            result["cpu"] = cpu.to_dict()
+
     if "memory" in sections:
         mem = get_memory_info()
         if mem:
-            result["memory"] = asdict(mem)
-    
+            result["memory"] = mem.to_dict()
+
     if "disk" in sections:
         disks = get_disk_info()
-        result["disks"] = [asdict(d) for d in disks]
-    
+        result["disks"] = [d.to_dict() for d in disks]
+
     if "processes" in sections:
         by_ram, by_cpu = get_top_processes(5)
         result["processes"] = {
-            "top_by_ram": [asdict(p) for p in by_ram],
-            "top_by_cpu": [asdict(p) for p in by_cpu],
+            "top_by_ram": [p.to_dict() for p in by_ram],
+            "top_by_cpu": [p.to_dict() for p in by_cpu],
         }
-    
+
     if "battery" in sections:
         battery = get_battery_info()
         if battery:
-            result["battery"] = asdict(battery)
+            result["battery"] = battery.to_dict()
     
     return result
 
@@ -322,70 +378,87 @@ def format_system_info_for_llm(info: Dict[str, Any]) -> str:
     Returns:
         Formatted string suitable for LLM context.
     """
-    lines = [f"\n## System Information (as of {info.get('timestamp', 'now')})\n"]
-    
+    # One pre-built block per section, written straight into a StringIO:
+    # no list of fragments and no final join allocation
+    buf = io.StringIO()
+    write = buf.write
+    write(f"\n## System Information (as of {info.get('timestamp', 'now')})\n\n")
+
     # Uptime
     uptime = info.get("uptime_hours", 0)
     if uptime:
-        lines.append(f"**Uptime:** {uptime} hours\n")
-    
+        write(f"**Uptime:** {uptime} hours\n\n")
+
     # CPU
     if "cpu" in info:
         cpu = info["cpu"]
-        lines.append(f"### CPU")
-        lines.append(f"- **Usage:** {cpu['percent']}%")
-        lines.append(f"- **Cores:** {cpu['cores_physical']} physical, {cpu['cores_logical']} logical")
-        if cpu.get("frequency_mhz"):
-            lines.append(f"- **Frequency:** {cpu['frequency_mhz']:.0f} MHz")
-        lines.append("")
-    
+        freq_line = (
+            f"\n- **Frequency:** {cpu['frequency_mhz']:.0f} MHz"
+            if cpu.get("frequency_mhz") else ""
+        )
+        write(
+            f"### CPU\n"
+            f"- **Usage:** {cpu['percent']}%\n"
+            f"- **Cores:** {cpu['cores_physical']} physical, {cpu['cores_logical']} logical"
+            f"{freq_line}\n\n"
+        )
+
     # Memory
     if "memory" in info:
         mem = info["memory"]
-        lines.append(f"### Memory (RAM)")
-        lines.append(f"- **Total:** {mem['total_gb']} GB")
-        lines.append(f"- **Used:** {mem['used_gb']} GB ({mem['percent']}%)")
-        lines.append(f"- **Available:** {mem['available_gb']} GB")
-        if mem.get("swap_total_gb", 0) > 0:
-            lines.append(f"- **Swap:** {mem['swap_used_gb']} / {mem['swap_total_gb']} GB ({mem['swap_percent']}%)")
-        lines.append("")
-    
+        swap_line = (
+            f"\n- **Swap:** {mem['swap_used_gb']} / {mem['swap_total_gb']} GB ({mem['swap_percent']}%)"
+            if mem.get("swap_total_gb", 0) > 0 else ""
+        )
+        write(
+            f"### Memory (RAM)\n"
+            f"- **Total:** {mem['total_gb']} GB\n"
+            f"- **Used:** {mem['used_gb']} GB ({mem['percent']}%)\n"
+            f"- **Available:** {mem['available_gb']} GB"
+            f"{swap_line}\n\n"
+        )
+
     # Disk
     if "disks" in info and info["disks"]:
-        lines.append(f"### Storage")
-        for disk in info["disks"]:
-            lines.append(f"- **{disk['mount_point']}:** {disk['free_gb']} GB free of {disk['total_gb']} GB ({disk['percent']}% used)")
-        lines.append("")
-    
+        disk_lines = "\n".join(
+            f"- **{disk['mount_point']}:** {disk['free_gb']} GB free of {disk['total_gb']} GB ({disk['percent']}% used)"
+            for disk in info["disks"]
+        )
+        write(f"### Storage\n{disk_lines}\n\n")
+
     # Processes
     if "processes" in info:
         procs = info["processes"]
         if procs.get("top_by_ram"):
-            lines.append(f"### Top Processes (by RAM)")
-            for p in procs["top_by_ram"][:5]:
-                lines.append(f"- **{p['name']}** (PID {p['pid']}): {p['ram_mb']} MB RAM, {p['cpu_percent']}% CPU")
-            lines.append("")
-        
+            ram_lines = "\n".join(
+                f"- **{p['name']}** (PID {p['pid']}): {p['ram_mb']} MB RAM, {p['cpu_percent']}% CPU"
+                for p in procs["top_by_ram"][:5]
+            )
+            write(f"### Top Processes (by RAM)\n{ram_lines}\n\n")
+
         if procs.get("top_by_cpu"):
             # Only show if different from RAM list
             cpu_names = {p['name'] for p in procs.get("top_by_cpu", [])}
             ram_names = {p['name'] for p in procs.get("top_by_ram", [])}
             if cpu_names != ram_names:
-                lines.append(f"### Top Processes (by CPU)")
-                for p in procs["top_by_cpu"][:5]:
-                    lines.append(f"- **{p['name']}** (PID {p['pid']}): {p['cpu_percent']}% CPU, {p['ram_mb']} MB RAM")
-                lines.append("")
-    
+                cpu_lines = "\n".join(
+                    f"- **{p['name']}** (PID {p['pid']}): {p['cpu_percent']}% CPU, {p['ram_mb']} MB RAM"
+                    for p in procs["top_by_cpu"][:5]
+                )
+                write(f"### Top Processes (by CPU)\n{cpu_lines}\n\n")
+
     # Battery
     if "battery" in info:
         bat = info["battery"]
         status = "Charging" if bat["charging"] else ("Plugged in" if bat["plugged_in"] else "On battery")
         time_str = f", {bat['time_remaining_mins']} min remaining" if bat.get("time_remaining_mins") else ""
-        lines.append(f"### Battery")
-        lines.append(f"- **Level:** {bat['percent']}% ({status}{time_str})")
-        lines.append("")
-    
-    return "\n".join(lines)
+        write(
+            f"### Battery\n"
+            f"- **Level:** {bat['percent']}% ({status}{time_str})\n\n"
+        )
+
+    # Sections write a trailing blank-line separator; drop the last one
+    return buf.getvalue()[:-1]
 
 
 # Quick test
@@ -6,6 +6,7 @@ Uses pytest fixtures to create isolated test environments.
 
 import os
 import shutil
+import sys
 import tempfile
 from pathlib import Path
 from typing import Generator
@@ -13,14 +14,35 @@ from typing import Generator
 import pytest
 
 from indexing.config import IndexerConfig, set_config
+from indexing.models import FileInfo
+
+
+def fileinfo(path: Path) -> FileInfo:
+    """Build a FileInfo from one stat() call.
+
+    The inline FileInfo.from_path(p, p.stat().st_mtime, p.stat().st_size)
+    pattern stats the file twice; this stats it once.
+    """
+    s = path.stat()
+    return FileInfo.from_path(path, s.st_mtime, s.st_size)
+
+
+# On Linux, put fixture trees on tmpfs so the many small writes and
+# renames the tests do never touch the block layer
+_TMPFS = "/dev/shm" if sys.platform == "linux" and os.path.isdir("/dev/shm") else None
+
+
+def make_temp_dir() -> Path:
+    """Create a test directory (tmpfs-backed where available)."""
+    tmp = tempfile.mkdtemp(prefix="indexer_test_", dir=_TMPFS)
+    # Resolve to handle macOS /var -> /private/var symlink
+    return Path(tmp).resolve()
 
 
 @pytest.fixture
 def temp_dir() -> Generator[Path, None, None]:
     """Create a temporary directory for test files."""
-    tmp = tempfile.mkdtemp(prefix="indexer_test_")
-    # Resolve to handle macOS /var -> /private/var symlink
-    resolved = Path(tmp).resolve()
+    resolved = make_temp_dir()
     yield resolved
     shutil.rmtree(str(resolved), ignore_errors=True)
 
@@ -41,9 +63,12 @@ def test_config(temp_dir: Path) -> IndexerConfig:
     return config
 
 
-@pytest.fixture
-def sample_files(temp_dir: Path) -> dict[str, Path]:
-    """Create sample files for testing."""
+def create_sample_files(temp_dir: Path) -> dict[str, Path]:
+    """Populate a directory with the standard sample files.
+
+    Split out of the fixture so class-scoped fixtures (which can't
+    depend on the function-scoped temp_dir) can reuse the same layout.
+    """
     files = {}
     
     # Text file
@@ -78,10 +103,16 @@ def sample_files(temp_dir: Path) -> dict[str, Path]:
     node_modules.mkdir()
     (node_modules / "package.json").write_text('{"name": "test"}')
     files["node_modules"] = node_modules / "package.json"
-    
+
     return files
 
 
+@pytest.fixture
+def sample_files(temp_dir: Path) -> dict[str, Path]:
+    """Create sample files for testing."""
+    return create_sample_files(temp_dir)
+
+
 @pytest.fixture
 def icloud_placeholder(temp_dir: Path) -> Path:
     """Create an iCloud placeholder file."""
@@ -9,26 +9,25 @@ Tests:
 """
 
 import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
 
 from indexing.hasher import Hasher, hash_files
 from indexing.models import FileInfo
+
+from conftest import fileinfo
 from indexing.config import IndexerConfig
 
 
 class TestHasher:
     """Tests for the Hasher class."""
     
-    @pytest.mark.asyncio
     async def test_hashes_text_file(self, sample_files, test_config):
         """Hasher computes hash for text files."""
-        file_info = FileInfo.from_path(
-            sample_files["txt"],
-            sample_files["txt"].stat().st_mtime,
-            sample_files["txt"].stat().st_size,
-        )
+        file_info = fileinfo(sample_files["txt"])
         
         hasher = Hasher(test_config)
         result = await hasher.hash_file(file_info)
@@ -39,14 +38,9 @@ class TestHasher:
         assert result.content is not None
         assert "sample text file" in result.content
     
-    @pytest.mark.asyncio
     async def test_extracts_first_line(self, sample_files, test_config):
         """Hasher extracts first line for display."""
-        file_info = FileInfo.from_path(
-            sample_files["txt"],
-            sample_files["txt"].stat().st_mtime,
-            sample_files["txt"].stat().st_size,
-        )
+        file_info = fileinfo(sample_files["txt"])
         
         hasher = Hasher(test_config)
         result = await hasher.hash_file(file_info)
@@ -54,13 +48,12 @@ class TestHasher:
         
         assert result.first_line == "This is a sample text file."
     
-    @pytest.mark.asyncio
     async def test_identical_content_same_hash(self, duplicate_files, test_config):
         """Files with identical content have the same hash."""
         file1, file2 = duplicate_files
         
-        info1 = FileInfo.from_path(file1, file1.stat().st_mtime, file1.stat().st_size)
-        info2 = FileInfo.from_path(file2, file2.stat().st_mtime, file2.stat().st_size)
+        info1 = fileinfo(file1)
+        info2 = fileinfo(file2)
         
         hasher = Hasher(test_config)
         results = await hasher.hash_files([info1, info2])
@@ -69,19 +62,10 @@ class TestHasher:
         assert len(results) == 2
         assert results[0].content_hash == results[1].content_hash
     
-    @pytest.mark.asyncio
     async def test_different_content_different_hash(self, sample_files, test_config):
         """Files with different content have different hashes."""
-        info_txt = FileInfo.from_path(
-            sample_files["txt"],
-            sample_files["txt"].stat().st_mtime,
-            sample_files["txt"].stat().st_size,
-        )
-        info_md = FileInfo.from_path(
-            sample_files["md"],
-            sample_files["md"].stat().st_mtime,
-            sample_files["md"].stat().st_size,
-        )
+        info_txt = fileinfo(sample_files["txt"])
+        info_md = fileinfo(sample_files["md"])
         
         hasher = Hasher(test_config)
         results = await hasher.hash_files([info_txt, info_md])
@@ -90,14 +74,13 @@ class TestHasher:
         assert len(results) == 2
         assert results[0].content_hash != results[1].content_hash
     
-    @pytest.mark.asyncio
     async def test_handles_deleted_file(self, temp_dir, test_config):
         """Hasher handles files deleted between scan and hash."""
         # Create file
         file = temp_dir / "temporary.txt"
         file.write_text("Will be deleted")
         
-        info = FileInfo.from_path(file, file.stat().st_mtime, file.stat().st_size)
+        info = fileinfo(file)
         
         # Delete the file
         file.unlink()
@@ -109,13 +92,12 @@ class TestHasher:
         # Should return empty list, not crash
         assert len(results) == 0
     
-    @pytest.mark.asyncio
     async def test_handles_binary_file(self, temp_dir, test_config):
         """Hasher handles binary files (hashes bytes, no content)."""
         binary = temp_dir / "binary.bin"
         binary.write_bytes(b"\x00\x01\x02\x03\xff\xfe\xfd")
         
-        info = FileInfo.from_path(binary, binary.stat().st_mtime, binary.stat().st_size)
+        info = fileinfo(binary)
         
         hasher = Hasher(test_config)
         result = await hasher.hash_file(info)
@@ -125,15 +107,17 @@ class TestHasher:
         assert len(result.content_hash) == 64
         # Content may be None or a replacement string for binary
     
-    @pytest.mark.asyncio
     async def test_parallel_hashing(self, temp_dir, test_config):
         """Hasher processes multiple files in parallel."""
-        # Create many files
-        files = []
-        for i in range(20):
+        # Create many files; writes go through a thread pool so the
+        # fixture doesn't serialize on disk IO
+        def _write(i: int) -> FileInfo:
             f = temp_dir / f"parallel_{i}.txt"
             f.write_text(f"Content for file {i}")
-            files.append(FileInfo.from_path(f, f.stat().st_mtime, f.stat().st_size))
+            return fileinfo(f)
+
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            files = list(pool.map(_write, range(20)))
         
         hasher = Hasher(test_config)
         results = await hasher.hash_files(files)
@@ -148,14 +132,9 @@ class TestHasher:
 class TestHasherConvenience:
     """Tests for convenience functions."""
     
-    @pytest.mark.asyncio
     async def test_hash_files_function(self, sample_files, test_config):
         """hash_files convenience function works."""
-        info = FileInfo.from_path(
-            sample_files["txt"],
-            sample_files["txt"].stat().st_mtime,
-            sample_files["txt"].stat().st_size,
-        )
+        info = fileinfo(sample_files["txt"])
         
         results = await hash_files([info], test_config)
         assert len(results) == 1
@@ -14,6 +14,8 @@ import pytest
 from indexing.cloud.icloud import ICloudHandler, get_icloud_handler
 from indexing.models import FileInfo, SyncStatus
 
+from conftest import fileinfo
+
 
 class TestICloudHandler:
     """Tests for iCloud placeholder handling."""
@@ -67,22 +69,14 @@ class TestICloudHandler:
     
     def test_sync_status_placeholder(self, handler, icloud_placeholder):
         """Handler returns PLACEHOLDER status for .icloud files."""
-        file_info = FileInfo.from_path(
-            icloud_placeholder,
-            icloud_placeholder.stat().st_mtime,
-            icloud_placeholder.stat().st_size,
-        )
+        file_info = fileinfo(icloud_placeholder)
         
         status = handler.get_sync_status(file_info)
         assert status == SyncStatus.PLACEHOLDER
     
     def test_sync_status_local(self, handler, sample_files):
         """Handler returns LOCAL status for regular files."""
-        file_info = FileInfo.from_path(
-            sample_files["txt"],
-            sample_files["txt"].stat().st_mtime,
-            sample_files["txt"].stat().st_size,
-        )
+        file_info = fileinfo(sample_files["txt"])
         
         status = handler.get_sync_status(file_info)
         assert status == SyncStatus.LOCAL
@@ -101,21 +95,13 @@ class TestICloudFileInfo:
     
     def test_fileinfo_detects_placeholder(self, icloud_placeholder):
         """FileInfo correctly identifies iCloud placeholders."""
-        info = FileInfo.from_path(
-            icloud_placeholder,
-            icloud_placeholder.stat().st_mtime,
-            icloud_placeholder.stat().st_size,
-        )
+        info = fileinfo(icloud_placeholder)
         
         assert info.is_icloud_placeholder is True
     
     def test_fileinfo_extracts_extension(self, icloud_placeholder):
         """FileInfo extracts correct extension from placeholder."""
-        info = FileInfo.from_path(
-            icloud_placeholder,
-            icloud_placeholder.stat().st_mtime,
-            icloud_placeholder.stat().st_size,
-        )
+        info = fileinfo(icloud_placeholder)
         
         # .document.pdf.icloud → should extract .pdf
         assert info.extension == ".pdf"
@@ -20,31 +20,41 @@ from indexing.models import IndexEntry, EntryType, DataSource
 from indexing.config import IndexerConfig
 
 
+@pytest.fixture(scope="session")
+def embedding_pool() -> np.ndarray:
+    """One float32 block sliced by every test needing embeddings.
+
+    The tests only care about shape and dtype, so slicing views off a
+    single allocation beats a fresh np.random.randn + float64->float32
+    cast per test.
+    """
+    return np.zeros((128, 384), dtype=np.float32)
+
+
+@pytest.fixture
+def indexer(test_config):
+    """Create an indexer against an in-memory database.
+
+    These tests only exercise SQL behavior, so :memory: skips the
+    per-test file creation and fsync traffic of a disk-backed db.
+    """
+    test_config.db_path = Path(":memory:")
+    idx = Indexer(test_config)
+    yield idx
+    idx.close()
+
+
 class TestIndexer:
     """Tests for the Indexer class."""
-    
-    @pytest.fixture
-    def indexer(self, test_config):
-        """Create an indexer instance."""
-        idx = Indexer(test_config)
-        yield idx
-        idx.close()
-    
+
     def test_creates_tables(self, indexer):
         """Indexer creates required tables on init."""
-        conn = indexer._get_connection()
-        
-        # Check tables exist
-        cursor = conn.execute(
-            "SELECT name FROM sqlite_master WHERE type='table'"
-        )
-        tables = {row[0] for row in cursor.fetchall()}
-        
-        assert "content" in tables
-        assert "paths" in tables
-        assert "chunks" in tables
+        # Connecting creates the schema and snapshots sqlite_master
+        indexer._get_connection()
+
+        assert {"content", "paths", "chunks"} <= indexer._tables
     
-    def test_bulk_insert_single_file(self, indexer):
+    def test_bulk_insert_single_file(self, indexer, embedding_pool):
         """Indexer inserts a single file entry."""
         entry = IndexEntry(
             text="test.txt - text file",
@@ -57,13 +67,11 @@ class TestIndexer:
             extra_metadata={"extension": ".txt"},
         )
         
-        embedding = np.random.randn(384).astype(np.float32)
-        
-        stats = indexer.bulk_insert_entries([entry], np.array([embedding]))
+        stats = indexer.bulk_insert_entries([entry], embedding_pool[:1])
         
         assert stats.files_indexed == 1
     
-    def test_bulk_insert_with_chunks(self, indexer):
+    def test_bulk_insert_with_chunks(self, indexer, embedding_pool):
         """Indexer inserts file and chunk entries together."""
         entries = [
             IndexEntry(
@@ -97,14 +105,12 @@ class TestIndexer:
             ),
         ]
         
-        embeddings = np.random.randn(3, 384).astype(np.float32)
-        
-        stats = indexer.bulk_insert_entries(entries, embeddings)
+        stats = indexer.bulk_insert_entries(entries, embedding_pool[:3])
         
         assert stats.files_indexed == 1
         assert stats.chunks_created == 2
     
-    def test_deduplicates_by_hash(self, indexer):
+    def test_deduplicates_by_hash(self, indexer, embedding_pool):
         """Indexer deduplicates content with same hash."""
         # Insert first file
         entry1 = IndexEntry(
@@ -116,8 +122,7 @@ class TestIndexer:
             folder="tmp",
             content_hash="same_hash_123",
         )
-        embeddings1 = np.random.randn(1, 384).astype(np.float32)
-        indexer.bulk_insert_entries([entry1], embeddings1)
+        indexer.bulk_insert_entries([entry1], embedding_pool[:1])
         
         # Insert second file with same hash (different path)
         entry2 = IndexEntry(
@@ -129,21 +134,17 @@ class TestIndexer:
             folder="tmp",
             content_hash="same_hash_123",  # Same hash!
         )
-        embeddings2 = np.random.randn(1, 384).astype(np.float32)
-        stats = indexer.bulk_insert_entries([entry2], embeddings2)
+        stats = indexer.bulk_insert_entries([entry2], embedding_pool[:1])
         
         assert stats.files_deduplicated == 1
-        
-        # Both paths should exist
-        paths = indexer.get_existing_paths()
+
+        # Both paths should exist, but only one content record
+        paths, hashes = indexer.get_index_state()
         assert "/tmp/original.txt" in paths
         assert "/tmp/copy.txt" in paths
-        
-        # But only one content record
-        hashes = indexer.get_existing_hashes()
         assert len(hashes) == 1
     
-    def test_updates_path_when_moved(self, indexer):
+    def test_updates_path_when_moved(self, indexer, embedding_pool):
         """Indexer updates path when file moves (same hash, new path)."""
         # Insert original
         entry1 = IndexEntry(
@@ -155,7 +156,7 @@ class TestIndexer:
             folder="tmp/old",
             content_hash="file_hash",
         )
-        embeddings = np.random.randn(1, 384).astype(np.float32)
+        embeddings = embedding_pool[:1]
         indexer.bulk_insert_entries([entry1], embeddings)
         
         # Insert at new location with same hash
@@ -178,7 +179,7 @@ class TestIndexer:
         paths = indexer.get_existing_paths()
         assert "/tmp/new/file.txt" in paths
     
-    def test_removes_stale_paths(self, indexer):
+    def test_removes_stale_paths(self, indexer, embedding_pool):
         """Indexer removes paths that no longer exist."""
         # Insert two files
         entries = [
@@ -201,8 +202,7 @@ class TestIndexer:
                 content_hash="hash2",
             ),
         ]
-        embeddings = np.random.randn(2, 384).astype(np.float32)
-        indexer.bulk_insert_entries(entries, embeddings)
+        indexer.bulk_insert_entries(entries, embedding_pool[:2])
         
         # Remove one
         removed = indexer.remove_stale_paths({"/tmp/keep.txt"})
@@ -213,7 +213,7 @@ class TestIndexer:
         assert "/tmp/keep.txt" in paths
         assert "/tmp/delete.txt" not in paths
     
-    def test_find_content_by_hash(self, indexer):
+    def test_find_content_by_hash(self, indexer, embedding_pool):
         """Indexer finds content by hash."""
         entry = IndexEntry(
             text="findme.txt",
@@ -224,8 +224,7 @@ class TestIndexer:
             folder="tmp",
             content_hash="searchable_hash",
         )
-        embeddings = np.random.randn(1, 384).astype(np.float32)
-        indexer.bulk_insert_entries([entry], embeddings)
+        indexer.bulk_insert_entries([entry], embedding_pool[:1])
         
         # Find it
         content_id = indexer.find_content_by_hash("searchable_hash")
@@ -237,30 +236,27 @@ class TestIndexer:
 
 class TestIndexerBulkOperations:
     """Tests for bulk operation performance."""
-    
-    @pytest.fixture
-    def indexer(self, test_config):
-        idx = Indexer(test_config)
-        yield idx
-        idx.close()
-    
-    def test_bulk_insert_many(self, indexer):
+
+    def test_bulk_insert_many(self, indexer, embedding_pool):
         """Indexer handles bulk inserts efficiently."""
-        entries = []
-        for i in range(100):
-            entries.append(IndexEntry(
-                text=f"file_{i}.txt - text file",
+        # Comprehension with the shared name formatted once per entry
+        names = [f"file_{i}.txt" for i in range(100)]
+        entries = [
+            IndexEntry(
+                text=name + " - text file",
                 entry_type=EntryType.FILE,
                 source=DataSource.DESKTOP,
-                file_path=f"/tmp/file_{i}.txt",
-                file_name=f"file_{i}.txt",
+                file_path="/tmp/" + name,
+                file_name=name,
                 folder="tmp",
                 content_hash=f"hash_{i}",
-            ))
-        
-        embeddings = np.random.randn(100, 384).astype(np.float32)
-        
-        stats = indexer.bulk_insert_entries(entries, embeddings)
-        
+            )
+            for i, name in enumerate(names)
+        ]
+
+
+        with indexer.bulk_mode():
+            stats = indexer.bulk_insert_entries(entries, embedding_pool[:100])
+
         assert stats.files_indexed == 100
         assert len(indexer.get_existing_paths()) == 100
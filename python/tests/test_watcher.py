@@ -10,7 +10,6 @@ Tests:
 import asyncio
 import time
 from pathlib import Path
-from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -60,29 +59,43 @@ class TestWatcher:
 
 class TestFileChange:
     """Tests for the FileChange dataclass."""
-    
-    def test_creates_added_change(self):
+
+    @pytest.fixture
+    def fake_clock(self, monkeypatch):
+        """Freeze time.monotonic so timestamps are deterministic.
+
+        Returns a one-element list; set fake_clock[0] to advance time.
+        """
+        clock = [0.0]
+        monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+        return clock
+
+    def test_creates_added_change(self, fake_clock):
         """FileChange creates an ADDED change."""
+        fake_clock[0] = 1.0
         change = FileChange(
             path=Path("/tmp/new.txt"),
             change_type=ChangeType.ADDED,
             timestamp=time.monotonic(),
         )
-        
+
         assert change.change_type == ChangeType.ADDED
         assert change.old_path is None
-    
-    def test_creates_moved_change(self):
+        assert change.timestamp == 1.0
+
+    def test_creates_moved_change(self, fake_clock):
         """FileChange creates a MOVED change with old path."""
+        fake_clock[0] = 2.0
         change = FileChange(
             path=Path("/tmp/new_location/file.txt"),
             change_type=ChangeType.MOVED,
             timestamp=time.monotonic(),
             old_path=Path("/tmp/old_location/file.txt"),
         )
-        
+
         assert change.change_type == ChangeType.MOVED
         assert change.old_path == Path("/tmp/old_location/file.txt")
+        assert change.timestamp == 2.0
 
 
 class TestWatcherDebounce:
@@ -0,0 +1,115 @@
+"""
+Adapt Raw Rows - Stage 2 of the two-stage adapter build (PyPy-friendly).
+
+Reads the normalized JSONL written by raw_dump.py and applies the chunk
+and format templates. Everything here is stdlib plus config.py (also
+pure stdlib), so the whole stage runs unchanged under
+
+    pypy3 adapt_and_write.py
+
+where the tracing JIT speeds up this string-heavy loop; Numba-style
+compilation is a poor fit for string workloads, PyPy is not. orjson is
+used when present (CPython) and the stdlib fallback keeps the PyPy
+path dependency-free.
+"""
+
+import random
+from pathlib import Path
+
+from config import CHUNK_FUNCS, FORMAT_FUNCS, NUM_FORMATS, NUM_CHUNKS
+
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+except ImportError:  # no orjson (e.g. under PyPy); fall back to stdlib
+    import json
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
+# Single-pass translation table for the bullet variant of chunk text
+_BULLET = str.maketrans({"[": "• "})
+
+LAYER_BY_SOURCE = {"squad_v2": 1, "hotpotqa": 2, "drop": 2, "coqa": 2}
+OUT_BY_LAYER = {1: "layer1_squad.jsonl", 2: "layer2_reasoning.jsonl"}
+CHUNK_SOURCE = {"squad_v2": "document", "drop": "document", "coqa": "story"}
+KV_PREFIX = {"squad_v2": "content=", "drop": "passage=", "coqa": "story="}
+
+def adapt_row(row: dict, idx: int) -> dict:
+    """Apply chunk and format templates to one raw row."""
+    source = row["source"]
+    if source == "hotpotqa":
+        # Multi-document context: chunks and separators into one buffer
+        buf = []
+        append = buf.append
+        for i, (title, content) in enumerate(zip(row["titles"], row["contents"])):
+            if i:
+                append("\n")
+            append(CHUNK_FUNCS[i % NUM_CHUNKS](idx=i+1, source=title, content=content))
+        chunks = "".join(buf)
+        base = chunks
+        bullet = chunks.translate(_BULLET)
+    else:
+        base = row["context"]
+        bullet = base
+        chunks = CHUNK_FUNCS[idx % NUM_CHUNKS](
+            idx=1, source=CHUNK_SOURCE[source], content=base
+        )
+
+    format_func = FORMAT_FUNCS[idx % NUM_FORMATS]
+    fields = format_func.fields
+    kwargs = {"chunks": chunks, "question": row["question"]}
+    if "chunks_bullet" in fields:
+        kwargs["chunks_bullet"] = bullet
+    if "chunks_kv" in fields:
+        kwargs["chunks_kv"] = KV_PREFIX.get(source, "") + base
+    if "chunks_escaped" in fields:
+        kwargs["chunks_escaped"] = base.replace('"', '\\"')
+    if "chunks_messy" in fields:
+        kwargs["chunks_messy"] = base
+
+    return {
+        "input": format_func(**kwargs),
+        "output": row["answer"],
+        "source": source,
+        "layer": LAYER_BY_SOURCE[source],
+    }
+
+def main(raw_path: str = "./data/raw/raw_rows.jsonl",
+         output_path: str = "./data/generated"):
+    by_layer = {layer: [] for layer in OUT_BY_LAYER}
+
+    with open(raw_path, "rb") as f:
+        for idx, line in enumerate(f):
+            adapted = adapt_row(_loads(line), idx)
+            by_layer[adapted["layer"]].append(adapted)
+
+    out_dir = Path(output_path)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    for layer, examples in by_layer.items():
+        # Shuffle an int permutation and leave the dicts where they are
+        perm = list(range(len(examples)))
+        random.shuffle(perm)
+        out_file = out_dir / OUT_BY_LAYER[layer]
+        # Buffered byte writes: one flush per ~64KB instead of two per row
+        with open(out_file, "wb") as f:
+            buf = bytearray()
+            for i in perm:
+                buf += _dumps(examples[i])
+                buf += b"\n"
+                if len(buf) >= 65536:
+                    f.write(buf)
+                    buf.clear()
+            if buf:
+                f.write(buf)
+        print(f"Saved {len(examples)} examples to {out_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Raw Dataset Dump - Stage 1 of the two-stage adapter build (CPython).
+
+Pulls rows from the HuggingFace datasets and writes them as normalized
+raw JSONL (source, question, answer, and the raw context fields) with
+no formatting applied. Stage 2 (adapt_and_write.py) applies the format
+templates and imports nothing beyond the stdlib, so the string-heavy
+half of the build can run under PyPy's tracing JIT.
+"""
+
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+from datasets import load_dataset
+from config import CACHE_DIR, LAYER_1_SIZE, LAYER_2_SIZE
+
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:  # orjson is optional; fall back to stdlib
+    import json
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+RAW_FILE = "raw_rows.jsonl"
+
+def dump_squad(out, num_examples: int = LAYER_1_SIZE) -> int:
+    """Dump answerable SQuAD rows."""
+    dataset = load_dataset(
+        "rajpurkar/squad_v2",
+        split="train",
+        cache_dir=CACHE_DIR,
+        download_mode="reuse_cache_if_exists",
+        verification_mode="no_checks",
+    )
+    count = 0
+    for ex in dataset:
+        if not ex["answers"]["text"]:
+            continue
+        out.write(_dumps({
+            "source": "squad_v2",
+            "context": ex["context"],
+            "question": ex["question"],
+            "answer": ex["answers"]["text"][0],
+        }) + b"\n")
+        count += 1
+        if count >= num_examples:
+            break
+    return count
+
+def dump_reasoning(out, num_examples: int = LAYER_2_SIZE) -> int:
+    """Dump HotpotQA/DROP/CoQA rows, normalized to one answer each."""
+    per_dataset = num_examples // 3
+    total = 0
+
+    hotpot = load_dataset(
+        "hotpot_qa", "distractor", split="train", streaming=True, cache_dir=CACHE_DIR
+    )
+    count = 0
+    for ex in islice(hotpot, per_dataset * 2):
+        out.write(_dumps({
+            "source": "hotpotqa",
+            "titles": ex["context"]["title"],
+            "contents": [" ".join(s) for s in ex["context"]["sentences"]],
+            "question": ex["question"],
+            "answer": ex["answer"],
+        }) + b"\n")
+        count += 1
+        if count >= per_dataset:
+            break
+    total += count
+
+    drop = load_dataset(
+        "ucinlp/drop", split="train", streaming=True, cache_dir=CACHE_DIR
+    )
+    count = 0
+    for ex in islice(drop, per_dataset * 2):
+        spans = ex["answers_spans"]["spans"]
+        if not spans:
+            continue
+        out.write(_dumps({
+            "source": "drop",
+            "context": ex["passage"],
+            "question": ex["question"],
+            "answer": spans[0],
+        }) + b"\n")
+        count += 1
+        if count >= per_dataset:
+            break
+    total += count
+
+    coqa = load_dataset(
+        "stanfordnlp/coqa", split="train", streaming=True, cache_dir=CACHE_DIR
+    )
+    # Turn selection happens here, while the dataset objects are in
+    # hand, so stage 2 sees one flat (question, answer) pair per row
+    turns = np.random.default_rng(0).integers(0, 1 << 20, size=per_dataset * 2)
+    count = 0
+    for i, ex in enumerate(islice(coqa, per_dataset * 2)):
+        questions = ex["questions"]
+        answers = ex["answers"]["input_text"]
+        if not questions or not answers:
+            continue
+        turn_idx = int(turns[i]) % len(questions)
+        out.write(_dumps({
+            "source": "coqa",
+            "context": ex["story"],
+            "question": questions[turn_idx],
+            "answer": answers[turn_idx],
+        }) + b"\n")
+        count += 1
+        if count >= per_dataset:
+            break
+    total += count
+
+    return total
+
+def main(output_path: str = "./data/raw"):
+    out_dir = Path(output_path)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    raw_file = out_dir / RAW_FILE
+
+    with open(raw_file, "wb", buffering=1 << 23) as out:
+        print("Dumping SQuAD 2.0...")
+        squad_count = dump_squad(out)
+        print(f"  {squad_count} rows")
+        print("Dumping reasoning datasets...")
+        reasoning_count = dump_reasoning(out)
+        print(f"  {reasoning_count} rows")
+
+    print(f"Wrote {squad_count + reasoning_count} raw rows to {raw_file}")
+
+if __name__ == "__main__":
+    main()
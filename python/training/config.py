@@ -2,6 +2,8 @@
 Training Data Configuration
 """
 
+import string
+
 # Output paths
 OUTPUT_DIR = "./data/generated"
 CACHE_DIR = "./data/cache"
@@ -45,5 +47,68 @@ CHUNK_TEMPLATES = [
     "{content}",
 ]
 
+def _compile_template(template: str):
+    """Pre-parse a format template into a plain concatenation closure.
+
+    str.format re-parses the template on every call; the generators call
+    it once per example, so the parse happens once here instead. Extra
+    keyword arguments are ignored, like str.format.
+    """
+    parts = [
+        (literal, field)
+        for literal, field, _spec, _conv in string.Formatter().parse(template)
+    ]
+
+    def render(**kwargs) -> str:
+        return "".join(
+            literal + (str(kwargs[field]) if field else "")
+            for literal, field in parts
+        )
+
+    render.fields = frozenset(field for _, field in parts if field)
+    return render
+
+
+# Compiled counterparts: FORMAT_FUNCS[i](**kw) == FORMAT_TEMPLATES[i].format(**kw).
+# Each function carries a .fields frozenset of the placeholder names it uses.
+FORMAT_FUNCS = [_compile_template(t) for t in FORMAT_TEMPLATES]
+CHUNK_FUNCS = [_compile_template(t) for t in CHUNK_TEMPLATES]
+
+
+def _compile_chunk_block(template: str):
+    """Pre-parse a chunk template into a renderer for a block of chunks.
+
+    Takes (idx, source, content) triples and renders every chunk plus
+    the joining newlines into one buffer, so multi-chunk contexts are
+    built with a single join instead of one format call per chunk and
+    a second join pass.
+    """
+    parts = [
+        (literal, field)
+        for literal, field, _spec, _conv in string.Formatter().parse(template)
+    ]
+
+    def render(items) -> str:
+        buf = []
+        append = buf.append
+        for idx, source, content in items:
+            if buf:
+                append("\n")
+            kw = {"idx": idx, "source": source, "content": content}
+            for literal, field in parts:
+                append(literal)
+                if field:
+                    append(str(kw[field]))
+        return "".join(buf)
+
+    return render
+
+
+CHUNK_BLOCK_FUNCS = [_compile_chunk_block(t) for t in CHUNK_TEMPLATES]
+
+# Template counts, hoisted so hot loops don't re-call len() per row
+NUM_FORMATS = len(FORMAT_TEMPLATES)
+NUM_CHUNKS = len(CHUNK_TEMPLATES)
+
 # Standard refusal response
 NO_ANSWER = "Not found in provided context."
@@ -9,10 +9,19 @@ Generates synthetic examples for:
 - Comparison/decision queries
 """
 
-import json
-import random
+from multiprocessing import get_context
 from pathlib import Path
-from config import FORMAT_TEMPLATES, CHUNK_TEMPLATES, LAYER_4_SIZE, NO_ANSWER
+import numpy as np
+from datasets import Dataset
+from config import FORMAT_FUNCS, CHUNK_FUNCS, CHUNK_BLOCK_FUNCS, LAYER_4_SIZE, NO_ANSWER, NUM_FORMATS, NUM_CHUNKS
+
+# Fork-based workers inherit the compiled templates copy-on-write, so
+# nothing is re-parsed or pickled per worker; spawn (the only option on
+# Windows) re-imports the module once per worker instead.
+try:
+    _mp = get_context("fork")
+except ValueError:  # platform without fork
+    _mp = get_context()
 
 # Content pools for realistic synthetic data
 SYSTEM_SPECS = [
@@ -23,6 +32,16 @@ SYSTEM_SPECS = [
     {"cpu": "Apple M1", "cores": 8, "ram_total": "8GB", "ram_free": "1GB", "disk": "256GB SSD", "disk_free": "20GB"},
 ]
 
+# Single-pass translation table for the bullet variant of chunk text
+_BULLET = str.maketrans({"[": "• "})
+
+# The table is static, so parse the RAM figures once instead of a
+# replace+float per generated example
+for _spec in SYSTEM_SPECS:
+    _spec["_ram_free_gb"] = float(_spec["ram_free"].rstrip("GB"))
+    _spec["_ram_total_gb"] = int(_spec["ram_total"].rstrip("GB"))
+del _spec
+
 PERSONAL_FACTS = [
     {"name": "Alex", "job": "software engineer", "company": "tech startup", "fav_lang": "Python", "city": "Montreal", "interests": ["AI/ML", "gaming", "music"]},
     {"name": "Jordan", "job": "data scientist", "company": "finance firm", "fav_lang": "R", "city": "Toronto", "interests": ["statistics", "hiking", "cooking"]},
@@ -43,10 +62,14 @@ WEB_RESULTS = [
     {"query": "Cyberpunk 2077 requirements", "result": "Minimum: 8GB RAM, GTX 1060, 70GB storage. Recommended: 16GB RAM, RTX 2060, SSD for faster loading."},
 ]
 
-def generate_system_example(format_idx: int) -> dict:
-    """Generate a system info query example."""
-    spec = random.choice(SYSTEM_SPECS)
-    
+def generate_system_example(format_idx: int, draws) -> dict:
+    """Generate a system info query example.
+
+    `draws` is a row of pre-sampled integers; each choice takes one
+    draw mod the pool size instead of calling the global RNG.
+    """
+    spec = SYSTEM_SPECS[draws[0] % len(SYSTEM_SPECS)]
+
     # Format the system info in various ways
     formats = [
         f"CPU: {spec['cpu']}, {spec['cores']} cores. RAM: {spec['ram_total']} total, {spec['ram_free']} free. Disk: {spec['disk']}, {spec['disk_free']} free.",
@@ -54,9 +77,9 @@ def generate_system_example(format_idx: int) -> dict:
         f"cpu={spec['cpu']}\ncores={spec['cores']}\nram={spec['ram_total']}\nram_free={spec['ram_free']}\ndisk={spec['disk_free']} free",
     ]
     
-    content = random.choice(formats)
-    chunk_template = CHUNK_TEMPLATES[format_idx % len(CHUNK_TEMPLATES)]
-    chunk = chunk_template.format(idx=1, source="system", content=content)
+    content = formats[draws[1] % len(formats)]
+    chunk_func = CHUNK_FUNCS[format_idx % NUM_CHUNKS]
+    chunk = chunk_func(idx=1, source="system", content=content)
     
     # Questions and answers
     qa_pairs = [
@@ -68,30 +91,34 @@ def generate_system_example(format_idx: int) -> dict:
     ]
     
     # "Why slow" questions with reasoning
-    ram_free_gb = float(spec['ram_free'].replace('GB', ''))
-    if ram_free_gb <= 2:
+    if spec["_ram_free_gb"] <= 2:
         qa_pairs.append(("Why is my computer slow?", f"Only {spec['ram_free']} RAM free"))
     
-    q, a = random.choice(qa_pairs)
-    
-    format_template = FORMAT_TEMPLATES[format_idx % len(FORMAT_TEMPLATES)]
-    input_text = format_template.format(
-        chunks=chunk,
-        chunks_bullet=content,
-        chunks_kv=content,
-        chunks_escaped=content.replace('"', '\\"'),
-        chunks_messy=content,
-        question=q
-    )
+    q, a = qa_pairs[draws[3] % len(qa_pairs)]
+    
+    format_func = FORMAT_FUNCS[format_idx % NUM_FORMATS]
+    # Only materialize the chunk variants this template references;
+    # the escaped/bullet variants rescan the whole context otherwise.
+    fields = format_func.fields
+    kwargs = {"chunks": chunk, "question": q}
+    if "chunks_bullet" in fields:
+        kwargs["chunks_bullet"] = content
+    if "chunks_kv" in fields:
+        kwargs["chunks_kv"] = content
+    if "chunks_escaped" in fields:
+        kwargs["chunks_escaped"] = content.replace('"', '\\"')
+    if "chunks_messy" in fields:
+        kwargs["chunks_messy"] = content
+    input_text = format_func(**kwargs)
     
     return {"input": input_text, "output": a, "source": "domain_system", "layer": 4}
 
-def generate_file_example(format_idx: int) -> dict:
+def generate_file_example(format_idx: int, draws) -> dict:
     """Generate a file content query example."""
-    file = random.choice(FILE_CONTENTS)
+    file = FILE_CONTENTS[draws[0] % len(FILE_CONTENTS)]
     
-    chunk_template = CHUNK_TEMPLATES[format_idx % len(CHUNK_TEMPLATES)]
-    chunk = chunk_template.format(idx=1, source=file['name'], content=file['content'])
+    chunk_func = CHUNK_FUNCS[format_idx % NUM_CHUNKS]
+    chunk = chunk_func(idx=1, source=file['name'], content=file['content'])
     
     # Generate question based on file type
     if "resume" in file['name']:
@@ -122,28 +149,33 @@ def generate_file_example(format_idx: int) -> dict:
             ("What's in this file?", file['content'][:50]),
         ]
     
-    q, a = random.choice(qa_pairs)
-    
-    format_template = FORMAT_TEMPLATES[format_idx % len(FORMAT_TEMPLATES)]
-    input_text = format_template.format(
-        chunks=chunk,
-        chunks_bullet=file['content'],
-        chunks_kv=f"{file['name']}={file['content']}",
-        chunks_escaped=file['content'].replace('"', '\\"'),
-        chunks_messy=file['content'],
-        question=q
-    )
+    q, a = qa_pairs[draws[3] % len(qa_pairs)]
+    
+    format_func = FORMAT_FUNCS[format_idx % NUM_FORMATS]
+    # Only materialize the chunk variants this template references;
+    # the escaped/bullet variants rescan the whole context otherwise.
+    fields = format_func.fields
+    kwargs = {"chunks": chunk, "question": q}
+    if "chunks_bullet" in fields:
+        kwargs["chunks_bullet"] = file['content']
+    if "chunks_kv" in fields:
+        kwargs["chunks_kv"] = f"{file['name']}={file['content']}"
+    if "chunks_escaped" in fields:
+        kwargs["chunks_escaped"] = file['content'].replace('"', '\\"')
+    if "chunks_messy" in fields:
+        kwargs["chunks_messy"] = file['content']
+    input_text = format_func(**kwargs)
     
     return {"input": input_text, "output": a, "source": "domain_file", "layer": 4}
 
-def generate_memory_example(format_idx: int) -> dict:
+def generate_memory_example(format_idx: int, draws) -> dict:
     """Generate a personal memory query example."""
-    person = random.choice(PERSONAL_FACTS)
+    person = PERSONAL_FACTS[draws[0] % len(PERSONAL_FACTS)]
     
     content = f"Works as a {person['job']} at {person['company']}. Favorite programming language is {person['fav_lang']}. Lives in {person['city']}. Interested in {', '.join(person['interests'])}."
     
-    chunk_template = CHUNK_TEMPLATES[format_idx % len(CHUNK_TEMPLATES)]
-    chunk = chunk_template.format(idx=1, source="memory", content=content)
+    chunk_func = CHUNK_FUNCS[format_idx % NUM_CHUNKS]
+    chunk = chunk_func(idx=1, source="memory", content=content)
     
     qa_pairs = [
         ("What's my favorite programming language?", person['fav_lang']),
@@ -153,34 +185,38 @@ def generate_memory_example(format_idx: int) -> dict:
         ("What are my interests?", ", ".join(person['interests'])),
     ]
     
-    q, a = random.choice(qa_pairs)
-    
-    format_template = FORMAT_TEMPLATES[format_idx % len(FORMAT_TEMPLATES)]
-    input_text = format_template.format(
-        chunks=chunk,
-        chunks_bullet=content,
-        chunks_kv=content,
-        chunks_escaped=content.replace('"', '\\"'),
-        chunks_messy=content,
-        question=q
-    )
+    q, a = qa_pairs[draws[3] % len(qa_pairs)]
+    
+    format_func = FORMAT_FUNCS[format_idx % NUM_FORMATS]
+    # Only materialize the chunk variants this template references;
+    # the escaped/bullet variants rescan the whole context otherwise.
+    fields = format_func.fields
+    kwargs = {"chunks": chunk, "question": q}
+    if "chunks_bullet" in fields:
+        kwargs["chunks_bullet"] = content
+    if "chunks_kv" in fields:
+        kwargs["chunks_kv"] = content
+    if "chunks_escaped" in fields:
+        kwargs["chunks_escaped"] = content.replace('"', '\\"')
+    if "chunks_messy" in fields:
+        kwargs["chunks_messy"] = content
+    input_text = format_func(**kwargs)
     
     return {"input": input_text, "output": a, "source": "domain_memory", "layer": 4}
 
-def generate_mixed_example(format_idx: int) -> dict:
+def generate_mixed_example(format_idx: int, draws) -> dict:
     """Generate a multi-source mixed context example."""
-    spec = random.choice(SYSTEM_SPECS)
-    file = random.choice(FILE_CONTENTS)
-    person = random.choice(PERSONAL_FACTS)
-    
-    chunks = []
-    chunk_template = CHUNK_TEMPLATES[format_idx % len(CHUNK_TEMPLATES)]
-    
-    chunks.append(chunk_template.format(idx=1, source=file['name'], content=file['content']))
-    chunks.append(chunk_template.format(idx=2, source="system", content=f"CPU: {spec['cpu']}, RAM: {spec['ram_total']}"))
-    chunks.append(chunk_template.format(idx=3, source="memory", content=f"Favorite language: {person['fav_lang']}. Lives in {person['city']}."))
-    
-    combined = "\n".join(chunks)
+    spec = SYSTEM_SPECS[draws[0] % len(SYSTEM_SPECS)]
+    file = FILE_CONTENTS[draws[1] % len(FILE_CONTENTS)]
+    person = PERSONAL_FACTS[draws[2] % len(PERSONAL_FACTS)]
+    
+    # One renderer pass builds all three chunks plus separators
+    chunk_block = CHUNK_BLOCK_FUNCS[format_idx % NUM_CHUNKS]
+    combined = chunk_block([
+        (1, file['name'], file['content']),
+        (2, "system", f"CPU: {spec['cpu']}, RAM: {spec['ram_total']}"),
+        (3, "memory", f"Favorite language: {person['fav_lang']}. Lives in {person['city']}."),
+    ])
     
     # Question that needs info from specific chunk
     qa_pairs = [
@@ -189,60 +225,77 @@ def generate_mixed_example(format_idx: int) -> dict:
         ("What programming languages am I good at?", "Python, JavaScript, TypeScript, Go" if "resume" in file['name'] else person['fav_lang']),
     ]
     
-    q, a = random.choice(qa_pairs)
-    
-    format_template = FORMAT_TEMPLATES[format_idx % len(FORMAT_TEMPLATES)]
-    input_text = format_template.format(
-        chunks=combined,
-        chunks_bullet=combined.replace("[", "• "),
-        chunks_kv=combined,
-        chunks_escaped=combined.replace('"', '\\"'),
-        chunks_messy=combined,
-        question=q
-    )
+    q, a = qa_pairs[draws[3] % len(qa_pairs)]
+    
+    format_func = FORMAT_FUNCS[format_idx % NUM_FORMATS]
+    # Only materialize the chunk variants this template references;
+    # the escaped/bullet variants rescan the whole context otherwise.
+    fields = format_func.fields
+    kwargs = {"chunks": combined, "question": q}
+    if "chunks_bullet" in fields:
+        kwargs["chunks_bullet"] = combined.translate(_BULLET)
+    if "chunks_kv" in fields:
+        kwargs["chunks_kv"] = combined
+    if "chunks_escaped" in fields:
+        kwargs["chunks_escaped"] = combined.replace('"', '\\"')
+    if "chunks_messy" in fields:
+        kwargs["chunks_messy"] = combined
+    input_text = format_func(**kwargs)
     
     return {"input": input_text, "output": a, "source": "domain_mixed", "layer": 4}
 
-def generate_comparison_example(format_idx: int) -> dict:
+def generate_comparison_example(format_idx: int, draws) -> dict:
     """Generate a comparison/decision query example."""
-    spec = random.choice(SYSTEM_SPECS)
-    game_req = random.choice(WEB_RESULTS)
+    spec = SYSTEM_SPECS[draws[0] % len(SYSTEM_SPECS)]
+    game_req = WEB_RESULTS[draws[1] % len(WEB_RESULTS)]
     
     if "requirements" not in game_req['query']:
         game_req = {"query": "game requirements", "result": "Minimum: 16GB RAM, RTX 2060, 70GB storage. Recommended: 32GB RAM, RTX 3070."}
     
-    chunks = []
-    chunk_template = CHUNK_TEMPLATES[format_idx % len(CHUNK_TEMPLATES)]
-    
-    chunks.append(chunk_template.format(idx=1, source="system", content=f"RAM: {spec['ram_total']}. GPU: {spec['cpu']}. Free disk: {spec['disk_free']}."))
-    chunks.append(chunk_template.format(idx=2, source="web", content=game_req['result']))
-    
-    combined = "\n".join(chunks)
+    # One renderer pass builds both chunks plus the separator
+    chunk_block = CHUNK_BLOCK_FUNCS[format_idx % NUM_CHUNKS]
+    combined = chunk_block([
+        (1, "system", f"RAM: {spec['ram_total']}. GPU: {spec['cpu']}. Free disk: {spec['disk_free']}."),
+        (2, "web", game_req['result']),
+    ])
     
     # Reasoning answer
-    ram_gb = int(spec['ram_total'].replace('GB', ''))
-    if ram_gb >= 16:
+    if spec["_ram_total_gb"] >= 16:
         answer = "Yes, meets minimum RAM requirement"
     else:
         answer = f"No, need 16GB RAM but only have {spec['ram_total']}"
     
-    format_template = FORMAT_TEMPLATES[format_idx % len(FORMAT_TEMPLATES)]
-    input_text = format_template.format(
-        chunks=combined,
-        chunks_bullet=combined,
-        chunks_kv=combined,
-        chunks_escaped=combined.replace('"', '\\"'),
-        chunks_messy=combined,
-        question="Can I run this game?"
-    )
+    format_func = FORMAT_FUNCS[format_idx % NUM_FORMATS]
+    # Only materialize the chunk variants this template references;
+    # the escaped/bullet variants rescan the whole context otherwise.
+    fields = format_func.fields
+    kwargs = {"chunks": combined, "question": "Can I run this game?"}
+    if "chunks_bullet" in fields:
+        kwargs["chunks_bullet"] = combined
+    if "chunks_kv" in fields:
+        kwargs["chunks_kv"] = combined
+    if "chunks_escaped" in fields:
+        kwargs["chunks_escaped"] = combined.replace('"', '\\"')
+    if "chunks_messy" in fields:
+        kwargs["chunks_messy"] = combined
+    input_text = format_func(**kwargs)
     
     return {"input": input_text, "output": answer, "source": "domain_comparison", "layer": 4}
 
+def _generate_one(args) -> dict:
+    """Pool worker: run one generator call, logging instead of raising."""
+    gen_func, format_idx, draws = args
+    try:
+        return gen_func(format_idx, draws)
+    except Exception as e:
+        print(f"  Error: {e}")
+        return None
+
 def generate_domain_dataset(output_path: str, num_examples: int = LAYER_4_SIZE):
     """Generate Layer 4 domain-specific dataset."""
     examples = []
     per_type = num_examples // 5
-    
+
     generators = [
         ("system", generate_system_example),
         ("file", generate_file_example),
@@ -251,26 +304,36 @@ def generate_domain_dataset(output_path: str, num_examples: int = LAYER_4_SIZE):
         ("comparison", generate_comparison_example),
     ]
     
-    for name, gen_func in generators:
-        print(f"Generating {per_type} {name} examples...")
-        for i in range(per_type):
-            try:
-                ex = gen_func(i)
-                examples.append(ex)
-            except Exception as e:
-                print(f"  Error: {e}")
-    
-    random.shuffle(examples)
-    
+    # The generators share no mutable state (their pools are read-only
+    # and every random draw is pre-sampled below), so the per-type
+    # loops parallelize across cores without any worker seeding.
+    rng = np.random.default_rng()
+    with _mp.Pool() as pool:
+        for name, gen_func in generators:
+            print(f"Generating {per_type} {name} examples...")
+            # One vectorized call pre-samples every random draw for this
+            # type; ~60k global-RNG random.choice calls otherwise
+            draw_matrix = rng.integers(0, 1 << 20, size=(per_type, 4))
+            tasks = ((gen_func, i, draw_matrix[i]) for i in range(per_type))
+            examples.extend(
+                ex
+                for ex in pool.imap_unordered(_generate_one, tasks, chunksize=256)
+                if ex is not None
+            )
+    
+    # Shuffle in Arrow instead of an O(N) swap pass over a Python list
+    # of dicts
+    ds = Dataset.from_list(examples).shuffle(writer_batch_size=1000)
+
     output_file = Path(output_path) / "layer4_domain.jsonl"
     output_file.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_file, "w") as f:
-        for ex in examples:
-            f.write(json.dumps(ex) + "\n")
-    
-    print(f"Saved {len(examples)} examples to {output_file}")
-    return examples[:15]
+
+    # pyarrow serializes and writes in batches, instead of one Python
+    # json.dumps call and small write per row
+    ds.to_json(str(output_file), lines=True, num_proc=4)
+
+    print(f"Saved {len(ds)} examples to {output_file}")
+    return [ds[i] for i in range(min(15, len(ds)))]
 
 if __name__ == "__main__":
     samples = generate_domain_dataset("./data/generated", num_examples=100)
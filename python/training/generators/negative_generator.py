@@ -7,10 +7,29 @@ Generates examples where the model should refuse to answer:
 - Partial matches (related but not exact)
 """
 
-import json
-import random
+from multiprocessing import get_context
 from pathlib import Path
-from config import FORMAT_TEMPLATES, CHUNK_TEMPLATES, LAYER_5_SIZE, NO_ANSWER
+import numpy as np
+
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:  # orjson is optional; fall back to stdlib
+    import json
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+from config import FORMAT_FUNCS, CHUNK_FUNCS, LAYER_5_SIZE, NO_ANSWER, NUM_FORMATS, NUM_CHUNKS
+
+# Fork-based workers inherit the compiled templates copy-on-write, so
+# nothing is re-parsed or pickled per worker; spawn (the only option on
+# Windows) re-imports the module once per worker instead.
+try:
+    _mp = get_context("fork")
+except ValueError:  # platform without fork
+    _mp = get_context()
 
 # Context pools that DON'T contain answers to the questions
 SYSTEM_CONTEXTS = [
@@ -37,150 +56,164 @@ WEB_CONTEXTS = [
     "Stock market today: S&P 500 up 0.5%, NASDAQ up 0.8%.",
 ]
 
-def generate_wrong_domain() -> dict:
-    """Generate example where question doesn't match context domain."""
-    combinations = [
-        (random.choice(SYSTEM_CONTEXTS), "system", "What does my resume say about my skills?"),
-        (random.choice(SYSTEM_CONTEXTS), "system", "What's in my todo list?"),
-        (random.choice(MEMORY_CONTEXTS), "memory", "How much disk space do I have?"),
-        (random.choice(MEMORY_CONTEXTS), "memory", "What files are in my Documents folder?"),
-        (random.choice(FILE_CONTEXTS), "notes.md", "What's the current weather?"),
-        (random.choice(FILE_CONTEXTS), "report.pdf", "What time is my meeting?"),
-        (random.choice(WEB_CONTEXTS), "web", "What's my favorite programming language?"),
-    ]
-    
-    content, source, question = random.choice(combinations)
-    
-    fmt_idx = random.randint(0, len(FORMAT_TEMPLATES) - 1)
-    chunk_template = CHUNK_TEMPLATES[fmt_idx % len(CHUNK_TEMPLATES)]
-    chunk = chunk_template.format(idx=1, source=source, content=content)
-    
-    format_template = FORMAT_TEMPLATES[fmt_idx]
-    input_text = format_template.format(
-        chunks=chunk,
-        chunks_bullet=content,
-        chunks_kv=f"{source}={content}",
-        chunks_escaped=content.replace('"', '\\"'),
-        chunks_messy=content,
-        question=question
-    )
-    
-    return {
-        "input": input_text,
-        "output": NO_ANSWER,
-        "source": "negative_wrong_domain",
-        "layer": 5
-    }
-
-def generate_out_of_scope() -> dict:
-    """Generate example with out-of-scope questions (opinions, predictions)."""
-    contexts = SYSTEM_CONTEXTS + MEMORY_CONTEXTS + FILE_CONTEXTS
-    context = random.choice(contexts)
-    source = random.choice(["document", "system", "memory"])
-    
-    out_of_scope_questions = [
-        "What will the weather be next week?",
-        "Should I buy this stock?",
-        "Is Python better than JavaScript?",
-        "Will AI take over my job?",
-        "What will my salary be next year?",
-        "Is this a good investment?",
-        "How will the project turn out?",
-        "What's the meaning of life?",
-    ]
-    
-    question = random.choice(out_of_scope_questions)
-    
-    fmt_idx = random.randint(0, len(FORMAT_TEMPLATES) - 1)
-    chunk_template = CHUNK_TEMPLATES[fmt_idx % len(CHUNK_TEMPLATES)]
-    chunk = chunk_template.format(idx=1, source=source, content=context)
-    
-    format_template = FORMAT_TEMPLATES[fmt_idx]
-    input_text = format_template.format(
-        chunks=chunk,
-        chunks_bullet=context,
-        chunks_kv=f"{source}={context}",
-        chunks_escaped=context.replace('"', '\\"'),
-        chunks_messy=context,
-        question=question
-    )
-    
-    return {
-        "input": input_text,
-        "output": NO_ANSWER,
-        "source": "negative_out_of_scope",
-        "layer": 5
-    }
-
-def generate_partial_match() -> dict:
-    """Generate example where context has related but not exact info."""
-    examples = [
-        # Has meeting info but not location
-        ("Meeting on Tuesday with Sarah and Mike. Topics: roadmap, budget.", "notes.md", "Where is the meeting located?"),
-        # Has project info but not specific deadline
-        ("Project Alpha: 60% complete. Team of 4 developers.", "project.md", "When is the project due?"),
-        # Has personal info but not phone number
-        ("Email: john@example.com. Lives in Montreal.", "contacts.txt", "What's my phone number?"),
-        # Has weather but not for requested city
-        ("Weather in Montreal: 15°C, sunny.", "web", "What's the weather in Toronto?"),
-        # Has file list but not the requested file
-        ("Files found: resume.pdf, notes.md, config.py", "search", "Show me my tax documents"),
-    ]
-    
-    content, source, question = random.choice(examples)
-    
-    fmt_idx = random.randint(0, len(FORMAT_TEMPLATES) - 1)
-    chunk_template = CHUNK_TEMPLATES[fmt_idx % len(CHUNK_TEMPLATES)]
-    chunk = chunk_template.format(idx=1, source=source, content=content)
-    
-    format_template = FORMAT_TEMPLATES[fmt_idx]
-    input_text = format_template.format(
-        chunks=chunk,
-        chunks_bullet=content,
-        chunks_kv=f"{source}={content}",
-        chunks_escaped=content.replace('"', '\\"'),
-        chunks_messy=content,
-        question=question
-    )
-    
-    return {
-        "input": input_text,
-        "output": NO_ANSWER,
-        "source": "negative_partial_match",
-        "layer": 5
-    }
+# (context pool, source, question) — the question never matches the pool
+WRONG_DOMAIN_COMBOS = [
+    (SYSTEM_CONTEXTS, "system", "What does my resume say about my skills?"),
+    (SYSTEM_CONTEXTS, "system", "What's in my todo list?"),
+    (MEMORY_CONTEXTS, "memory", "How much disk space do I have?"),
+    (MEMORY_CONTEXTS, "memory", "What files are in my Documents folder?"),
+    (FILE_CONTEXTS, "notes.md", "What's the current weather?"),
+    (FILE_CONTEXTS, "report.pdf", "What time is my meeting?"),
+    (WEB_CONTEXTS, "web", "What's my favorite programming language?"),
+]
+
+OUT_OF_SCOPE_CONTEXTS = SYSTEM_CONTEXTS + MEMORY_CONTEXTS + FILE_CONTEXTS
+OUT_OF_SCOPE_SOURCES = ["document", "system", "memory"]
+OUT_OF_SCOPE_QUESTIONS = [
+    "What will the weather be next week?",
+    "Should I buy this stock?",
+    "Is Python better than JavaScript?",
+    "Will AI take over my job?",
+    "What will my salary be next year?",
+    "Is this a good investment?",
+    "How will the project turn out?",
+    "What's the meaning of life?",
+]
+
+PARTIAL_MATCH_EXAMPLES = [
+    # Has meeting info but not location
+    ("Meeting on Tuesday with Sarah and Mike. Topics: roadmap, budget.", "notes.md", "Where is the meeting located?"),
+    # Has project info but not specific deadline
+    ("Project Alpha: 60% complete. Team of 4 developers.", "project.md", "When is the project due?"),
+    # Has personal info but not phone number
+    ("Email: john@example.com. Lives in Montreal.", "contacts.txt", "What's my phone number?"),
+    # Has weather but not for requested city
+    ("Weather in Montreal: 15°C, sunny.", "web", "What's the weather in Toronto?"),
+    # Has file list but not the requested file
+    ("Files found: resume.pdf, notes.md, config.py", "search", "Show me my tax documents"),
+]
+
+def _render(content: str, source: str, question: str, fmt_idx: int) -> str:
+    """Render one negative example input through the compiled templates."""
+    fmt_idx %= NUM_FORMATS
+    chunk_func = CHUNK_FUNCS[fmt_idx % NUM_CHUNKS]
+    chunk = chunk_func(idx=1, source=source, content=content)
+
+    format_func = FORMAT_FUNCS[fmt_idx]
+    # Only materialize the chunk variants this template references;
+    # the escaped/bullet variants rescan the whole context otherwise.
+    fields = format_func.fields
+    kwargs = {"chunks": chunk, "question": question}
+    if "chunks_bullet" in fields:
+        kwargs["chunks_bullet"] = content
+    if "chunks_kv" in fields:
+        kwargs["chunks_kv"] = f"{source}={content}"
+    if "chunks_escaped" in fields:
+        kwargs["chunks_escaped"] = content.replace('"', '\\"')
+    if "chunks_messy" in fields:
+        kwargs["chunks_messy"] = content
+    return format_func(**kwargs)
+
+def generate_wrong_domain(draws) -> str:
+    """Generate input where question doesn't match context domain."""
+    pool, source, question = WRONG_DOMAIN_COMBOS[draws[0] % len(WRONG_DOMAIN_COMBOS)]
+    content = pool[draws[1] % len(pool)]
+    return _render(content, source, question, draws[2])
+
+def generate_out_of_scope(draws) -> str:
+    """Generate input with out-of-scope questions (opinions, predictions)."""
+    context = OUT_OF_SCOPE_CONTEXTS[draws[0] % len(OUT_OF_SCOPE_CONTEXTS)]
+    source = OUT_OF_SCOPE_SOURCES[draws[1] % len(OUT_OF_SCOPE_SOURCES)]
+    question = OUT_OF_SCOPE_QUESTIONS[draws[3] % len(OUT_OF_SCOPE_QUESTIONS)]
+    return _render(context, source, question, draws[2])
+
+def generate_partial_match(draws) -> str:
+    """Generate input where context has related but not exact info."""
+    content, source, question = PARTIAL_MATCH_EXAMPLES[draws[0] % len(PARTIAL_MATCH_EXAMPLES)]
+    return _render(content, source, question, draws[2])
+
+_GENERATORS = {
+    "wrong_domain": generate_wrong_domain,
+    "out_of_scope": generate_out_of_scope,
+    "partial_match": generate_partial_match,
+}
+
+def _generate_one(task):
+    """Pool worker: build one input text from its pre-drawn indices."""
+    name, draws = task
+    try:
+        return name, _GENERATORS[name](draws)
+    except Exception as e:
+        print(f"  Error: {e}")
+        return None
 
 def generate_negative_dataset(output_path: str, num_examples: int = LAYER_5_SIZE):
     """Generate Layer 5 negative examples dataset."""
-    examples = []
-    
     generators = [
-        ("wrong_domain", generate_wrong_domain, 0.40),
-        ("out_of_scope", generate_out_of_scope, 0.35),
-        ("partial_match", generate_partial_match, 0.25),
+        ("wrong_domain", 0.40),
+        ("out_of_scope", 0.35),
+        ("partial_match", 0.25),
     ]
-    
-    for name, gen_func, ratio in generators:
+
+    # All random selections are drawn upfront as one integer matrix and
+    # indexed with `draws[k] % len(pool)` in the generators, so the loop
+    # pays no per-example RNG state updates and workers share no state
+    rng = np.random.default_rng()
+    tasks = []
+    for name, ratio in generators:
         count = int(num_examples * ratio)
         print(f"Generating {count} {name} examples...")
-        for _ in range(count):
-            try:
-                ex = gen_func()
-                examples.append(ex)
-            except Exception as e:
-                print(f"  Error: {e}")
-    
-    random.shuffle(examples)
-    
+        draw_matrix = rng.integers(0, 1 << 20, size=(count, 4))
+        tasks.extend((name, draw_matrix[i]) for i in range(count))
+
+    # Columns instead of a list of dicts: output and layer are constant
+    # here, so only the varying fields are held in memory and the row
+    # dict exists just long enough to be serialized. The result count
+    # is bounded by len(tasks), so preallocate instead of growing.
+    inputs = [None] * len(tasks)
+    sources = [None] * len(tasks)
+    n = 0
+    with _mp.Pool() as pool:
+        for result in pool.imap_unordered(_generate_one, tasks, chunksize=1000):
+            if result is None:
+                continue
+            name, input_text = result
+            inputs[n] = input_text
+            sources[n] = "negative_" + name
+            n += 1
+    del inputs[n:], sources[n:]
+
+    # Write in a permuted order instead of shuffling the lists in place
+    order = np.random.default_rng().permutation(len(inputs))
+
     output_file = Path(output_path) / "layer5_negatives.jsonl"
     output_file.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_file, "w") as f:
-        for ex in examples:
-            f.write(json.dumps(ex) + "\n")
-    
-    print(f"Saved {len(examples)} examples to {output_file}")
-    return examples[:10]
+
+    # orjson serializes in C and returns bytes, skipping the per-row
+    # str->bytes encode of a text-mode writer. Rows accumulate into a
+    # ~64KB buffer so each flush is one write call instead of two per
+    # row.
+    with open(output_file, "wb") as f:
+        buf = bytearray()
+        for i in order:
+            buf += _dumps({
+                "input": inputs[i],
+                "output": NO_ANSWER,
+                "source": sources[i],
+                "layer": 5,
+            })
+            buf += b"\n"
+            if len(buf) >= 65536:
+                f.write(buf)
+                buf.clear()
+        if buf:
+            f.write(buf)
+
+    print(f"Saved {len(inputs)} examples to {output_file}")
+    return [
+        {"input": inputs[i], "output": NO_ANSWER, "source": sources[i], "layer": 5}
+        for i in order[:10]
+    ]
 
 if __name__ == "__main__":
     samples = generate_negative_dataset("./data/generated", num_examples=100)
@@ -4,9 +4,12 @@ Master Pipeline - Generate Full 55K Dataset
 Downloads all source datasets and generates the complete training data.
 """
 
+import functools
 import json
 import random
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import get_context
 from pathlib import Path
 
 # Add parent to path
@@ -14,6 +17,63 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import *
 
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:  # orjson is optional; fall back to stdlib
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+
+# Fork-based workers inherit the compiled templates copy-on-write, so
+# nothing is re-parsed or pickled per worker; spawn (the only option on
+# Windows) re-imports the module once per worker instead.
+try:
+    _mp = get_context("fork")
+except ValueError:  # platform without fork
+    _mp = get_context()
+
+try:
+    from tqdm import tqdm
+except ImportError:  # progress bars are optional
+    def tqdm(iterable, **kwargs):
+        return iterable
+
+def _write_jsonl(path, examples):
+    """Write examples as JSONL with batched binary writes.
+
+    Rows accumulate into a ~64KB buffer on top of a wide (8MB) file
+    buffer, so tens of thousands of examples cost a handful of write
+    calls instead of one per line.
+    """
+    with open(path, "wb", buffering=1 << 23) as f:
+        buf = bytearray()
+        for ex in examples:
+            buf += _dumps(ex)
+            buf += b"\n"
+            if len(buf) >= 65536:
+                f.write(buf)
+                buf.clear()
+        if buf:
+            f.write(buf)
+
+@functools.lru_cache(maxsize=2048)
+def _esc500(s: str) -> str:
+    """Escaped-and-truncated chunk variant, cached per distinct string.
+
+    replace() rescans the whole context and the slice allocates again;
+    layers 1-3 feed the same SQuAD contexts through repeatedly, so hot
+    strings are escaped once.
+    """
+    return s.replace('"', '\\"')[:500]
+
+@functools.lru_cache(maxsize=4096)
+def _render_chunk(chunk_idx: int, idx: int, source: str, content: str) -> str:
+    """Memoized chunk render — repeated contexts skip the re-format."""
+    return CHUNK_FUNCS[chunk_idx](idx=idx, source=source, content=content)
+
 def generate_layer1_squad(output_path: str, num_examples: int = 15000):
     """Layer 1: SQuAD 2.0 answerable examples."""
     from datasets import load_dataset
@@ -22,14 +82,22 @@ def generate_layer1_squad(output_path: str, num_examples: int = 15000):
     print("LAYER 1: Downloading SQuAD 2.0...")
     print(f"{'='*60}")
     
-    dataset = load_dataset("rajpurkar/squad_v2", split="train")
-    
-    examples = []
-    format_count = len(FORMAT_TEMPLATES)
-    chunk_count = len(CHUNK_TEMPLATES)
-    
-    for i, ex in enumerate(dataset):
-        if len(examples) >= num_examples:
+    # Stream instead of materializing ~130k rows when only the first
+    # 15k answerable ones are kept
+    dataset = load_dataset(
+        "rajpurkar/squad_v2", split="train", streaming=True, cache_dir=CACHE_DIR
+    )
+    
+    # Columns instead of a list of dicts: source and layer are constant
+    # for the whole layer, so only the varying fields live in memory.
+    # The target count is known, so preallocate and assign by index
+    # rather than growing the lists through reallocation steps.
+    inputs = [None] * num_examples
+    outputs = [None] * num_examples
+    n = 0
+    
+    for i, ex in enumerate(tqdm(dataset, total=num_examples, desc="Layer 1 SQuAD")):
+        if n >= num_examples:
             break
         
         # Skip unanswerable
@@ -40,40 +108,45 @@ def generate_layer1_squad(output_path: str, num_examples: int = 15000):
         question = ex["question"]
         answer = ex["answers"]["text"][0]
         
-        # Format variance
-        fmt_idx = i % format_count
-        chunk_idx = i % chunk_count
-        
-        chunk = CHUNK_TEMPLATES[chunk_idx].format(idx=1, source="document", content=context)
-        
-        input_text = FORMAT_TEMPLATES[fmt_idx].format(
-            chunks=chunk,
-            chunks_bullet=context,
-            chunks_kv=f"content={context}",
-            chunks_escaped=context.replace('"', '\\"')[:500],
-            chunks_messy=context,
-            question=question
-        )
-        
-        examples.append({
-            "input": input_text,
-            "output": answer,
-            "source": "squad_v2",
-            "layer": 1
-        })
+        # Format variance (compiled templates; only build the chunk
+        # variants the selected format references)
+        fmt_idx = i % NUM_FORMATS
+        chunk_idx = i % NUM_CHUNKS
+
+        chunk = _render_chunk(chunk_idx, 1, "document", context)
+
+        format_func = FORMAT_FUNCS[fmt_idx]
+        fields = format_func.fields
+        kwargs = {"chunks": chunk, "question": question}
+        if "chunks_bullet" in fields:
+            kwargs["chunks_bullet"] = context
+        if "chunks_kv" in fields:
+            kwargs["chunks_kv"] = f"content={context}"
+        if "chunks_escaped" in fields:
+            kwargs["chunks_escaped"] = _esc500(context)
+        if "chunks_messy" in fields:
+            kwargs["chunks_messy"] = context
+        input_text = format_func(**kwargs)
         
-        if len(examples) % 5000 == 0:
-            print(f"  Processed {len(examples)} examples...")
+        inputs[n] = input_text
+        outputs[n] = answer
+        n += 1
     
-    random.shuffle(examples)
+    del inputs[n:], outputs[n:]
+    
+    # Shuffle a permutation of indices; the row dicts are only built at
+    # write time
+    perm = list(range(len(inputs)))
+    random.shuffle(perm)
     
     output_file = Path(output_path) / "layer1_squad.jsonl"
-    with open(output_file, "w") as f:
-        for ex in examples:
-            f.write(json.dumps(ex) + "\n")
+    _write_jsonl(output_file, (
+        {"input": inputs[i], "output": outputs[i], "source": "squad_v2", "layer": 1}
+        for i in perm
+    ))
     
-    print(f"  Saved {len(examples)} examples to {output_file}")
-    return len(examples)
+    print(f"  Saved {len(inputs)} examples to {output_file}")
+    return len(inputs)
 
 def generate_layer2_reasoning(output_path: str, num_examples: int = 15000):
     """Layer 2: Reasoning datasets (HotpotQA, DROP, CoQA)."""
@@ -83,13 +156,18 @@ def generate_layer2_reasoning(output_path: str, num_examples: int = 15000):
     print("LAYER 2: Downloading Reasoning Datasets...")
     print(f"{'='*60}")
     
-    examples = []
+    # Columns instead of a list of dicts; layer is constant 2
+    inputs = []
+    outputs = []
+    sources = []
     per_dataset = num_examples // 3
     
     # HotpotQA
     print("  Loading HotpotQA...")
     try:
-        hotpot = load_dataset("hotpot_qa", "distractor", split="train")
+        hotpot = load_dataset(
+            "hotpot_qa", "distractor", split="train", streaming=True, cache_dir=CACHE_DIR
+        )
         count = 0
         for i, ex in enumerate(hotpot):
             if count >= per_dataset:
@@ -99,29 +177,26 @@ def generate_layer2_reasoning(output_path: str, num_examples: int = 15000):
             context_parts = []
             for j, (title, sentences) in enumerate(zip(ex["context"]["title"], ex["context"]["sentences"])):
                 content = " ".join(sentences)
-                chunk = CHUNK_TEMPLATES[j % len(CHUNK_TEMPLATES)].format(idx=j+1, source=title, content=content)
+                chunk = _render_chunk(j % NUM_CHUNKS, j+1, title, content)
                 context_parts.append(chunk)
-            
+
             chunks = "\n".join(context_parts[:3])  # Limit to 3 chunks
             question = ex["question"]
             answer = ex["answer"]
+
+            format_func = FORMAT_FUNCS[i % NUM_FORMATS]
+            # Every chunk variant is the same joined string here, so
+            # fill all referenced fields in one shot and only fix up
+            # the escaped one
+            kwargs = dict.fromkeys(format_func.fields, chunks)
+            kwargs["question"] = question
+            if "chunks_escaped" in kwargs:
+                kwargs["chunks_escaped"] = _esc500(chunks)
+            input_text = format_func(**kwargs)
             
-            fmt_idx = i % len(FORMAT_TEMPLATES)
-            input_text = FORMAT_TEMPLATES[fmt_idx].format(
-                chunks=chunks,
-                chunks_bullet=chunks,
-                chunks_kv=chunks,
-                chunks_escaped=chunks.replace('"', '\\"')[:500],
-                chunks_messy=chunks,
-                question=question
-            )
-            
-            examples.append({
-                "input": input_text,
-                "output": answer,
-                "source": "hotpotqa",
-                "layer": 2
-            })
+            inputs.append(input_text)
+            outputs.append(answer)
+            sources.append("hotpotqa")
             count += 1
         print(f"    Added {count} HotpotQA examples")
     except Exception as e:
@@ -130,7 +205,9 @@ def generate_layer2_reasoning(output_path: str, num_examples: int = 15000):
     # DROP
     print("  Loading DROP...")
     try:
-        drop = load_dataset("ucinlp/drop", split="train")
+        drop = load_dataset(
+            "ucinlp/drop", split="train", streaming=True, cache_dir=CACHE_DIR
+        )
         count = 0
         for i, ex in enumerate(drop):
             if count >= per_dataset:
@@ -144,24 +221,24 @@ def generate_layer2_reasoning(output_path: str, num_examples: int = 15000):
                 continue
             answer = answer_info["spans"][0]
             
-            chunk = CHUNK_TEMPLATES[i % len(CHUNK_TEMPLATES)].format(idx=1, source="document", content=context)
-            
-            fmt_idx = i % len(FORMAT_TEMPLATES)
-            input_text = FORMAT_TEMPLATES[fmt_idx].format(
-                chunks=chunk,
-                chunks_bullet=context,
-                chunks_kv=f"passage={context}",
-                chunks_escaped=context.replace('"', '\\"')[:500],
-                chunks_messy=context,
-                question=question
-            )
+            chunk = _render_chunk(i % NUM_CHUNKS, 1, "document", context)
+
+            format_func = FORMAT_FUNCS[i % NUM_FORMATS]
+            fields = format_func.fields
+            kwargs = {"chunks": chunk, "question": question}
+            if "chunks_bullet" in fields:
+                kwargs["chunks_bullet"] = context
+            if "chunks_kv" in fields:
+                kwargs["chunks_kv"] = f"passage={context}"
+            if "chunks_escaped" in fields:
+                kwargs["chunks_escaped"] = _esc500(context)
+            if "chunks_messy" in fields:
+                kwargs["chunks_messy"] = context
+            input_text = format_func(**kwargs)
             
-            examples.append({
-                "input": input_text,
-                "output": answer,
-                "source": "drop",
-                "layer": 2
-            })
+            inputs.append(input_text)
+            outputs.append(answer)
+            sources.append("drop")
             count += 1
         print(f"    Added {count} DROP examples")
     except Exception as e:
@@ -170,7 +247,9 @@ def generate_layer2_reasoning(output_path: str, num_examples: int = 15000):
     # CoQA
     print("  Loading CoQA...")
     try:
-        coqa = load_dataset("stanfordnlp/coqa", split="train")
+        coqa = load_dataset(
+            "stanfordnlp/coqa", split="train", streaming=True, cache_dir=CACHE_DIR
+        )
         count = 0
         for i, ex in enumerate(coqa):
             if count >= per_dataset:
@@ -188,100 +267,122 @@ def generate_layer2_reasoning(output_path: str, num_examples: int = 15000):
             question = questions[turn_idx]
             answer = answers[turn_idx]
             
-            chunk = CHUNK_TEMPLATES[i % len(CHUNK_TEMPLATES)].format(idx=1, source="story", content=context)
-            
-            fmt_idx = i % len(FORMAT_TEMPLATES)
-            input_text = FORMAT_TEMPLATES[fmt_idx].format(
-                chunks=chunk,
-                chunks_bullet=context,
-                chunks_kv=f"story={context}",
-                chunks_escaped=context.replace('"', '\\"')[:500],
-                chunks_messy=context,
-                question=question
-            )
+            chunk = _render_chunk(i % NUM_CHUNKS, 1, "story", context)
+
+            format_func = FORMAT_FUNCS[i % NUM_FORMATS]
+            fields = format_func.fields
+            kwargs = {"chunks": chunk, "question": question}
+            if "chunks_bullet" in fields:
+                kwargs["chunks_bullet"] = context
+            if "chunks_kv" in fields:
+                kwargs["chunks_kv"] = f"story={context}"
+            if "chunks_escaped" in fields:
+                kwargs["chunks_escaped"] = _esc500(context)
+            if "chunks_messy" in fields:
+                kwargs["chunks_messy"] = context
+            input_text = format_func(**kwargs)
             
-            examples.append({
-                "input": input_text,
-                "output": answer,
-                "source": "coqa",
-                "layer": 2
-            })
+            inputs.append(input_text)
+            outputs.append(answer)
+            sources.append("coqa")
             count += 1
         print(f"    Added {count} CoQA examples")
     except Exception as e:
         print(f"    CoQA error: {e}")
     
-    random.shuffle(examples)
+    perm = list(range(len(inputs)))
+    random.shuffle(perm)
     
     output_file = Path(output_path) / "layer2_reasoning.jsonl"
-    with open(output_file, "w") as f:
-        for ex in examples:
-            f.write(json.dumps(ex) + "\n")
+    _write_jsonl(output_file, (
+        {"input": inputs[i], "output": outputs[i], "source": sources[i], "layer": 2}
+        for i in perm
+    ))
     
-    print(f"  Saved {len(examples)} examples to {output_file}")
-    return len(examples)
+    print(f"  Saved {len(inputs)} examples to {output_file}")
+    return len(inputs)
+
+# One source label per format slot; variants come back in format order
+_VARIANT_SOURCES = tuple(f"format_variance_{i}" for i in range(NUM_FORMATS))
+
+def _layer3_variants(task):
+    """Pool worker: render one base Q&A in every format."""
+    context, question, answer = task
+    # The same context feeds all 8 formats, so the derived variants are
+    # built once per base instead of once per variant
+    kv = f"content={context}"
+    escaped = _esc500(context)
+    # 8 formats cycle through 5 chunk templates, so render each chunk
+    # once and reuse it for the formats that share it
+    chunks = [_render_chunk(c, 1, "document", context) for c in range(NUM_CHUNKS)]
+    variant_inputs = []
+    for fmt_idx, format_func in enumerate(FORMAT_FUNCS):
+        variant_inputs.append(format_func(
+            chunks=chunks[fmt_idx % len(chunks)],
+            chunks_bullet=context,
+            chunks_kv=kv,
+            chunks_escaped=escaped,
+            chunks_messy=context,
+            question=question
+        ))
+    return answer, variant_inputs
 
 def generate_layer3_format_variance(output_path: str, num_examples: int = 10000):
     """Layer 3: Format variance - same Q&A in multiple formats."""
     from datasets import load_dataset
-    
+
     print(f"\n{'='*60}")
     print("LAYER 3: Generating Format Variance...")
     print(f"{'='*60}")
-    
-    # Use SQuAD as base, apply all formats to each example
-    dataset = load_dataset("rajpurkar/squad_v2", split="train")
-    
-    examples = []
-    base_count = num_examples // len(FORMAT_TEMPLATES)
-    
-    count = 0
+
+    # Use SQuAD as base, apply all formats to each example; streaming
+    # fetches only the ~1250 base rows the loop below keeps
+    dataset = load_dataset(
+        "rajpurkar/squad_v2", split="train", streaming=True, cache_dir=CACHE_DIR
+    )
+
+    base_count = num_examples // NUM_FORMATS
+
+    # Collect the base Q&As, then render the 8 variants per base in
+    # parallel — the rendering is pure string work with no shared state
+    bases = []
     for ex in dataset:
-        if count >= base_count:
+        if len(bases) >= base_count:
             break
-        
+
         if not ex["answers"]["text"]:
             continue
-        
-        context = ex["context"]
-        question = ex["question"]
-        answer = ex["answers"]["text"][0]
-        
-        # Generate same Q&A in ALL formats
-        for fmt_idx, fmt in enumerate(FORMAT_TEMPLATES):
-            chunk = CHUNK_TEMPLATES[fmt_idx % len(CHUNK_TEMPLATES)].format(
-                idx=1, source="document", content=context
-            )
-            
-            input_text = fmt.format(
-                chunks=chunk,
-                chunks_bullet=context,
-                chunks_kv=f"content={context}",
-                chunks_escaped=context.replace('"', '\\"')[:500],
-                chunks_messy=context,
-                question=question
-            )
-            
-            examples.append({
-                "input": input_text,
-                "output": answer,
-                "source": f"format_variance_{fmt_idx}",
-                "layer": 3
-            })
-        
-        count += 1
-        if count % 500 == 0:
-            print(f"  Processed {count} base examples ({len(examples)} total with variants)...")
-    
-    random.shuffle(examples)
-    
+
+        bases.append((ex["context"], ex["question"], ex["answers"]["text"][0]))
+
+    # Variants stream straight to disk as they come back from the pool
+    # instead of accumulating ~80k rows for an in-memory shuffle —
+    # combine_all_layers re-shuffles within each layer anyway
     output_file = Path(output_path) / "layer3_format_variance.jsonl"
-    with open(output_file, "w") as f:
-        for ex in examples:
-            f.write(json.dumps(ex) + "\n")
-    
-    print(f"  Saved {len(examples)} examples to {output_file}")
-    return len(examples)
+    total = 0
+    with open(output_file, "wb", buffering=1 << 23) as f, _mp.Pool() as pool:
+        buf = bytearray()
+        for answer, variant_inputs in tqdm(
+            pool.imap_unordered(_layer3_variants, bases, chunksize=64),
+            total=len(bases), desc="Layer 3 variants",
+        ):
+            for fmt_idx, input_text in enumerate(variant_inputs):
+                buf += _dumps({
+                    "input": input_text,
+                    "output": answer,
+                    "source": _VARIANT_SOURCES[fmt_idx],
+                    "layer": 3,
+                })
+                buf += b"\n"
+            total += len(variant_inputs)
+            if len(buf) >= 65536:
+                f.write(buf)
+                buf.clear()
+        if buf:
+            f.write(buf)
+
+    print(f"  Saved {total} examples to {output_file}")
+    return total
 
 def generate_layer4_domain(output_path: str, num_examples: int = 10000):
     """Layer 4: Domain-specific examples."""
@@ -307,66 +408,63 @@ def generate_layer5_negatives(output_path: str, num_examples: int = 5000):
     examples = generate_negative_dataset(output_path, num_examples)
     return len(examples) if isinstance(examples, list) else num_examples
 
+def _read_lines(layer_file):
+    """Read one layer file as raw lines (thread pool worker)."""
+    with open(layer_file, "rb") as f:
+        return f.readlines()
+
 def combine_all_layers(output_path: str):
     """Combine all layer files into a single training dataset."""
     print(f"\n{'='*60}")
     print("COMBINING ALL LAYERS...")
     print(f"{'='*60}")
     
-    all_examples = []
+    # Bucket raw lines by layer in a single pass — the layer number is
+    # in the filename, so nothing is parsed or re-serialized and the
+    # curriculum order falls out of the bucket order. The files are
+    # read concurrently; line splitting holds the GIL but the disk
+    # reads overlap.
+    buckets = [[] for _ in range(6)]
+    file_counts = {}
     path = Path(output_path)
-    
-    for layer_file in sorted(path.glob("layer*.jsonl")):
-        print(f"  Reading {layer_file.name}...")
-        with open(layer_file) as f:
-            for line in f:
-                all_examples.append(json.loads(line))
-    
-    # Curriculum order: layer 1 first, then by layer
-    all_examples.sort(key=lambda x: x["layer"])
-    
-    # Shuffle within each layer, then interleave later layers
-    final_examples = []
-    for layer in range(1, 6):
-        layer_examples = [e for e in all_examples if e["layer"] == layer]
-        random.shuffle(layer_examples)
-        final_examples.extend(layer_examples)
-    
-    # Save combined file
+
+    layer_files = sorted(path.glob("layer*.jsonl"))
+    with ThreadPoolExecutor(max_workers=5) as reader:
+        for layer_file, lines in zip(layer_files, reader.map(_read_lines, layer_files)):
+            print(f"  Read {layer_file.name}...")
+            buckets[int(layer_file.stem[5])].extend(lines)
+            file_counts[layer_file.name] = len(lines)
+    
+    # Save combined file: layer 1 first, shuffled within each layer
     combined_file = path / "train_combined.jsonl"
-    with open(combined_file, "w") as f:
-        for ex in final_examples:
-            f.write(json.dumps(ex) + "\n")
+    with open(combined_file, "wb", buffering=1 << 23) as f:
+        for bucket in buckets[1:]:
+            random.shuffle(bucket)
+            f.writelines(bucket)
     
-    print(f"  Saved {len(final_examples)} total examples to {combined_file}")
+    total = sum(len(bucket) for bucket in buckets)
+    print(f"  Saved {total} total examples to {combined_file}")
     
     # Stats
     print(f"\n{'='*60}")
     print("DATASET STATISTICS")
     print(f"{'='*60}")
     
-    layer_counts = {}
-    source_counts = {}
-    for ex in final_examples:
-        layer = ex["layer"]
-        source = ex["source"]
-        layer_counts[layer] = layer_counts.get(layer, 0) + 1
-        source_counts[source] = source_counts.get(source, 0) + 1
-    
     print("\nBy Layer:")
-    for layer in sorted(layer_counts.keys()):
-        print(f"  Layer {layer}: {layer_counts[layer]:,} examples")
+    for layer, bucket in enumerate(buckets):
+        if bucket:
+            print(f"  Layer {layer}: {len(bucket):,} examples")
     
-    print("\nBy Source:")
-    for source in sorted(source_counts.keys()):
-        print(f"  {source}: {source_counts[source]:,} examples")
+    print("\nBy File:")
+    for name in sorted(file_counts.keys()):
+        print(f"  {name}: {file_counts[name]:,} examples")
     
     # File size
     size_bytes = combined_file.stat().st_size
     size_mb = size_bytes / (1024 * 1024)
     print(f"\nFile size: {size_mb:.2f} MB")
     
-    return len(final_examples)
+    return total
 
 def main():
     output_path = Path(__file__).parent.parent.parent.parent / "T5finetuning" / "data" / "generated"
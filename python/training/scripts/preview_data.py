@@ -41,19 +41,24 @@ def preview_squad():
     ]
     
     for i, ex in enumerate(examples):
-        fmt_idx = i % len(FORMAT_TEMPLATES)
-        chunk_idx = i % len(CHUNK_TEMPLATES)
+        fmt_idx = i % NUM_FORMATS
+        chunk_idx = i % NUM_CHUNKS
         
-        chunk = CHUNK_TEMPLATES[chunk_idx].format(idx=1, source="document", content=ex['context'])
-        
-        input_text = FORMAT_TEMPLATES[fmt_idx].format(
-            chunks=chunk,
-            chunks_bullet=ex['context'],
-            chunks_kv=f"content={ex['context']}",
-            chunks_escaped=ex['context'].replace('"', '\\"'),
-            chunks_messy=ex['context'],
-            question=ex['question']
-        )
+        chunk = CHUNK_FUNCS[chunk_idx](idx=1, source="document", content=ex['context'])
+
+        format_func = FORMAT_FUNCS[fmt_idx]
+        # Pass only the chunk variants this template actually reads
+        fields = format_func.fields
+        kwargs = {"chunks": chunk, "question": ex['question']}
+        if "chunks_bullet" in fields:
+            kwargs["chunks_bullet"] = ex['context']
+        if "chunks_kv" in fields:
+            kwargs["chunks_kv"] = f"content={ex['context']}"
+        if "chunks_escaped" in fields:
+            kwargs["chunks_escaped"] = ex['context'].replace('"', '\\"')
+        if "chunks_messy" in fields:
+            kwargs["chunks_messy"] = ex['context']
+        input_text = format_func(**kwargs)
         
         print(f"\n--- Example {i+1} (Format {fmt_idx+1}) ---")
         print(f"INPUT:\n{input_text}")
@@ -103,17 +108,21 @@ def preview_format_variance():
     
     print("\nShowing the SAME Q&A in 4 different formats:\n")
     
-    for i, fmt in enumerate(FORMAT_TEMPLATES[:4]):
-        chunk = CHUNK_TEMPLATES[i % len(CHUNK_TEMPLATES)].format(idx=1, source="system", content=base_content)
-        
-        input_text = fmt.format(
-            chunks=chunk,
-            chunks_bullet=base_content,
-            chunks_kv=f"cpu=Apple M2 (8 cores)\nram=8GB total, 2GB free",
-            chunks_escaped=base_content.replace('"', '\\"'),
-            chunks_messy=base_content,
-            question=question
-        )
+    for i, format_func in enumerate(FORMAT_FUNCS[:4]):
+        chunk = CHUNK_FUNCS[i % NUM_CHUNKS](idx=1, source="system", content=base_content)
+
+        # Pass only the chunk variants this template actually reads
+        fields = format_func.fields
+        kwargs = {"chunks": chunk, "question": question}
+        if "chunks_bullet" in fields:
+            kwargs["chunks_bullet"] = base_content
+        if "chunks_kv" in fields:
+            kwargs["chunks_kv"] = "cpu=Apple M2 (8 cores)\nram=8GB total, 2GB free"
+        if "chunks_escaped" in fields:
+            kwargs["chunks_escaped"] = base_content.replace('"', '\\"')
+        if "chunks_messy" in fields:
+            kwargs["chunks_messy"] = base_content
+        input_text = format_func(**kwargs)
         
         print(f"--- Format {i+1} ---")
         print(f"INPUT:\n{input_text}")